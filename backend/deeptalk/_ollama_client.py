@@ -0,0 +1,18 @@
+# backend/deeptalk/_ollama_client.py - Shared HTTP connection pool for Ollama calls
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    # No retries: the views tell connection errors and timeouts apart
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Keep-alive session for the views' health checks and generations, so each call
+# reuses a pooled connection instead of opening a new one
+OLLAMA_SESSION = _build_session()
@@ -1,9 +1,39 @@
 # backend/deeptalk/dialogue_manager.py
-from typing import Dict, List, Any, Optional
+from abc import ABC, abstractmethod
+from typing import Deque, Dict, List, Any, Optional, Tuple
+from collections import deque
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import lru_cache
 from django.utils import timezone
+import heapq
 import json
+import re
+import threading
+import time
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# Snapshot encoding for the Redis store: msgspec's C encoder when installed, stdlib json otherwise.
+# Both are module-level and thread-safe; non-JSON values (datetimes) are stringified either way.
+if msgspec is not None:
+    _encode_json = msgspec.json.Encoder(enc_hook=str).encode
+    _decode_json = msgspec.json.Decoder().decode
+else:
+    def _encode_json(obj: Any) -> str:
+        return json.dumps(obj, default=str)
+    _decode_json = json.loads
+
+# Duration expressions such as "2 hours", "90 mins"; group 2 carries the unit
+_DURATION_RE = re.compile(r'(\d+)\s*(hours?|hrs?|minutes?|mins?)', re.IGNORECASE)
+
+# Question words that mean the reply is not a task name
+_QUESTION_WORDS = frozenset(("when", "how", "what", "where"))
 
 
 class ConversationState(Enum):
@@ -28,46 +58,349 @@ class UserIntent(Enum):
     CASUAL_CHAT = "casual_chat"
 
 
-@dataclass
+# Keyword -> intent lookup, listed in precedence order (first group wins ties)
+_INTENT_KEYWORDS = (
+    (UserIntent.SCHEDULE_EVENT, ("schedule", "book", "plan")),
+    (UserIntent.CREATE_REMINDER, ("remind", "reminder", "alert")),
+    (UserIntent.QUERY_SCHEDULE, ("what", "when", "show", "list")),
+    (UserIntent.MODIFY_TASK, ("change", "modify", "update", "edit")),
+    (UserIntent.DELETE_TASK, ("delete", "remove", "cancel")),
+    (UserIntent.GET_SUGGESTIONS, ("suggest", "recommend", "help", "ideas")),
+)
+_INTENT_TABLE = {word: intent for intent, words in _INTENT_KEYWORDS for word in words}
+_INTENT_RANK = {intent: rank for rank, (intent, _) in enumerate(_INTENT_KEYWORDS)}
+
+# Enum -> value string tables, so response building skips the Enum.value descriptor
+_STATE_VAL = {state: state.value for state in ConversationState}
+_INTENT_VAL = {intent: intent.value for intent in UserIntent}
+_INTENT_VAL[None] = None
+
+_WORD_RE = re.compile(r'[a-z]+')
+
+# Confirmation replies, matched as whole words ("yesterday" is not a yes)
+_YES_TOKENS = frozenset({"yes", "yeah", "yep", "ok", "okay", "sure", "confirm"})
+# Multi-word confirmations, matched as consecutive words ("let's go back" is not one)
+_YES_BIGRAMS = frozenset({("go", "ahead")})
+_NO_TOKENS = frozenset({"no", "nope", "not", "cancel", "wait", "stop"})
+
+# Critical task details in the order they are asked for, with their presence checks
+_REQUIRED_DETAILS = (
+    ("name", lambda data: len((data.get("name") or "").strip()) >= 3),
+    ("duration", lambda data: bool(data.get("estimated_duration_minutes"))),
+    # Only require deadline for high priority tasks
+    ("deadline", lambda data: data.get("base_priority", 3) > 2 or bool(data.get("deadline"))),
+)
+
+# Indexed by base_priority (1=critical .. 5=very low)
+_PRIORITY_TEXT = ("", "critical", "high", "medium", "low", "very low")
+
+_CLARIFICATION_QUESTIONS = {
+    "name": "What would you like to call this task?",
+    "duration": "How long do you think this will take?",
+    "deadline": "When does this need to be completed?",
+    "category": "What category would this fall under?",
+    "priority": "How important is this task (high, medium, or low priority)?"
+}
+_CLARIFICATION_FALLBACK = "Could you provide more details about %s?"
+
+# Sliding window of history messages kept per session (two per turn)
+MAX_HISTORY_ENTRIES = 50
+
+
+@lru_cache(maxsize=1024)
+def _classify_cached(should_create: bool, text_lower: str) -> UserIntent:
+    """Pure intent classification, memoized on (should_create_task, lowered input)"""
+    if should_create:
+        return UserIntent.CREATE_TASK
+    
+    # Single token scan against the keyword table
+    best = None
+    for token in _WORD_RE.findall(text_lower):
+        hit = _INTENT_TABLE.get(token) or _INTENT_TABLE.get(token.rstrip("s"))
+        if hit is not None and (best is None or _INTENT_RANK[hit] < _INTENT_RANK[best]):
+            best = hit
+            if _INTENT_RANK[hit] == 0:
+                break
+    
+    return best or UserIntent.CASUAL_CHAT
+
+
+def _history_column() -> Deque[str]:
+    return deque(maxlen=MAX_HISTORY_ENTRIES)
+
+
+@dataclass(slots=True)
 class ConversationContext:
-    """Context tracking for ongoing conversations"""
+    """Context tracking for ongoing conversations (slotted: no per-instance __dict__, Python 3.10+)"""
     user_id: str
     session_id: str
     current_state: ConversationState
     current_intent: Optional[UserIntent]
     pending_task_data: Dict[str, Any]
-    conversation_history: List[Dict[str, str]]
     last_interaction: timezone.datetime
     clarification_needed: Optional[str]
     suggested_actions: List[Dict[str, Any]]
+    # Conversation history as parallel columns, one entry per message
+    hist_ts: Deque[str] = field(default_factory=_history_column)
+    hist_role: Deque[str] = field(default_factory=_history_column)
+    hist_text: Deque[str] = field(default_factory=_history_column)
+    hist_state: Deque[str] = field(default_factory=_history_column)
+    # (hash of pending_task_data, summary text); cleared whenever pending data changes
+    _summary_cache: Optional[Tuple[int, str]] = field(default=None, repr=False)
+    
+    def append_history(self, timestamp: str, role: str, text: str, state: str = "") -> None:
+        """Append one message to the history columns"""
+        self.hist_ts.append(timestamp)
+        self.hist_role.append(role)
+        self.hist_text.append(text)
+        self.hist_state.append(state)
+    
+    def history_view(self) -> List[Dict[str, str]]:
+        """Materialize the history as a list of dicts, only when serialization needs it"""
+        return [
+            {"timestamp": ts, "role": role, "text": text, "state": state}
+            for ts, role, text, state in zip(self.hist_ts, self.hist_role, self.hist_text, self.hist_state)
+        ]
+
+
+class ContextStore(ABC):
+    """Interface for persisting conversation contexts outside the worker process"""
+    
+    @abstractmethod
+    def get(self, user_id: str, session_id: str) -> Optional[ConversationContext]:
+        """The user's stored context for session_id, or None"""
+    
+    @abstractmethod
+    def put(self, context: ConversationContext) -> None:
+        """Store the context's state"""
+    
+    @abstractmethod
+    def append_history(self, session_id: str, *entries: Dict[str, str]) -> None:
+        """Append history entries to the stored session"""
+    
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remove the stored session"""
+
+
+class RedisContextStore(ContextStore):
+    """Redis-backed store: one hash per session for state, one capped list for history"""
+    
+    def __init__(self, client, ttl_seconds: int = 1800,
+                 max_history: int = MAX_HISTORY_ENTRIES, prefix: str = "deeptalk"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_history = max_history
+        self.prefix = prefix
+    
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisContextStore":
+        """Build a store from a redis:// URL (requires the redis package)"""
+        import redis
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+    
+    def _ctx_key(self, session_id: str) -> str:
+        return f"{self.prefix}:ctx:{session_id}"
+    
+    def _hist_key(self, session_id: str) -> str:
+        return f"{self.prefix}:hist:{session_id}"
+    
+    def get(self, user_id: str, session_id: str) -> Optional[ConversationContext]:
+        pipe = self.client.pipeline()
+        pipe.hgetall(self._ctx_key(session_id))
+        pipe.lrange(self._hist_key(session_id), -self.max_history, -1)
+        data, history = pipe.execute()
+        # A session id only resolves for the user who owns it
+        if not data or data["user_id"] != str(user_id):
+            return None
+        
+        context = ConversationContext(
+            user_id=data["user_id"],
+            session_id=session_id,
+            current_state=ConversationState(data["state"]),
+            current_intent=UserIntent(data["intent"]) if data.get("intent") else None,
+            pending_task_data=_decode_json(data.get("pending_task_data") or "{}"),
+            last_interaction=timezone.datetime.fromisoformat(data["last_interaction"]),
+            clarification_needed=data.get("clarification_needed") or None,
+            suggested_actions=[]
+        )
+        for raw in history:
+            entry = _decode_json(raw)
+            context.append_history(entry["timestamp"], entry["role"], entry["text"], entry.get("state", ""))
+        return context
+    
+    def put(self, context: ConversationContext) -> None:
+        key = self._ctx_key(context.session_id)
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping={
+            "user_id": context.user_id,
+            "state": _STATE_VAL[context.current_state],
+            "intent": _INTENT_VAL[context.current_intent] or "",
+            "pending_task_data": _encode_json(context.pending_task_data),
+            "clarification_needed": context.clarification_needed or "",
+            "last_interaction": context.last_interaction.isoformat()
+        })
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+    
+    def append_history(self, session_id: str, *entries: Dict[str, str]) -> None:
+        if not entries:
+            return
+        key = self._hist_key(session_id)
+        pipe = self.client.pipeline()
+        pipe.rpush(key, *(_encode_json(entry) for entry in entries))
+        pipe.ltrim(key, -self.max_history, -1)
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+    
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self._ctx_key(session_id), self._hist_key(session_id))
+
+
+class SnapshotContextStore(ContextStore):
+    """Database cold tier: contexts are written when evicted and promoted back on access"""
+    
+    def __init__(self, max_age_days: int = 7):
+        self.max_age = timedelta(days=max_age_days)
+    
+    def get(self, user_id: str, session_id: str) -> Optional[ConversationContext]:
+        # Imported lazily so this module does not need the app registry at import time
+        from .models import ConversationContextSnapshot
+        
+        # Scoped to the owner, so another user's session id finds nothing
+        snapshot = ConversationContextSnapshot.objects.filter(
+            user_id=user_id,
+            session_id=session_id,
+            updated_at__gte=timezone.now() - self.max_age
+        ).first()
+        if snapshot is None:
+            return None
+        
+        context = ConversationContext(
+            user_id=snapshot.user_id,
+            session_id=session_id,
+            current_state=ConversationState(snapshot.state),
+            current_intent=UserIntent(snapshot.intent) if snapshot.intent else None,
+            pending_task_data=snapshot.pending_task_data,
+            last_interaction=snapshot.updated_at,
+            clarification_needed=snapshot.clarification_needed or None,
+            suggested_actions=[]
+        )
+        for entry in snapshot.history:
+            context.append_history(entry["timestamp"], entry["role"], entry["text"], entry.get("state", ""))
+        return context
+    
+    def put(self, context: ConversationContext) -> None:
+        from .models import ConversationContextSnapshot
+        
+        ConversationContextSnapshot.objects.update_or_create(
+            session_id=context.session_id,
+            defaults={
+                "user_id": context.user_id,
+                "state": _STATE_VAL[context.current_state],
+                "intent": _INTENT_VAL[context.current_intent] or "",
+                "pending_task_data": context.pending_task_data,
+                "clarification_needed": context.clarification_needed or "",
+                "history": context.history_view()
+            }
+        )
+    
+    def append_history(self, session_id: str, *entries: Dict[str, str]) -> None:
+        # History is written in full with the snapshot on eviction
+        pass
+    
+    def delete(self, session_id: str) -> None:
+        from .models import ConversationContextSnapshot
+        ConversationContextSnapshot.objects.filter(session_id=session_id).delete()
 
 
 class DialogueManager:
     """Advanced dialogue management with context tracking"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[ContextStore] = None,
+                 cold_store: Optional[ContextStore] = None):
+        # active_sessions is the per-worker hot layer; store (if any) is shared across workers
+        self.store = store
+        # cold_store (if any) receives expired contexts and is consulted on a miss
+        self.cold_store = cold_store
         self.active_sessions: Dict[str, ConversationContext] = {}
         self.context_timeout_minutes = 30
+        # Min-heap of (monotonic expiry, session_id); stale entries are skipped on pop
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._session_expiry: Dict[str, float] = {}
+        # Guards the expiry heap and map (touch and sweep); plain lookups and inserts
+        # rely on dict.get/setdefault being atomic and take no lock
+        self._sweep_lock = threading.Lock()
+        self.summary_cache_hits = 0
+        self.summary_cache_misses = 0
+        self.fast_path_hits = 0
     
-    def get_or_create_context(self, user_id: str, session_id: str = None) -> ConversationContext:
+    def get_or_create_context(self, user_id: str, session_id: str = None,
+                              now: Optional[timezone.datetime] = None) -> ConversationContext:
         """Get existing context or create new one"""
+        if now is None:
+            now = timezone.now()
+        mono_now = time.monotonic()
+        self._expire_sessions(mono_now)
+        
         if not session_id:
-            session_id = f"{user_id}_{timezone.now().timestamp()}"
+            session_id = f"{user_id}_{now.timestamp()}"
         
-        if session_id in self.active_sessions:
-            context = self.active_sessions[session_id]
-            # Check if context is still valid
-            time_diff = timezone.now() - context.last_interaction
-            if time_diff.total_seconds() / 60 > self.context_timeout_minutes:
-                # Context expired, create new one
-                context = self._create_new_context(user_id, session_id)
+        # The shared store is authoritative: the session may have moved on in another
+        # worker since this one cached it, so read through instead of trusting the copy
+        context = self.store.get(user_id, session_id) if self.store is not None else None
+        if context is not None:
+            self.active_sessions[session_id] = context
         else:
-            context = self._create_new_context(user_id, session_id)
-        
-        self.active_sessions[session_id] = context
+            # Expired sessions were already swept, so any hit is still valid
+            context = self.active_sessions.get(session_id)
+            if context is None:
+                if self.cold_store is not None:
+                    context = self.cold_store.get(user_id, session_id)
+                if context is None:
+                    context = self._create_new_context(user_id, session_id, now)
+                # setdefault is atomic: concurrent creators for one session all get the winner
+                context = self.active_sessions.setdefault(session_id, context)
+        
+        return self._touch_session(context, mono_now)
+    
+    def _touch_session(self, context: ConversationContext, now: float) -> ConversationContext:
+        """Push a fresh expiry for the session onto the heap; returns the live context"""
+        expires_at = now + self.context_timeout_minutes * 60
+        with self._sweep_lock:
+            # The sweep may have evicted the context since it was looked up; put it
+            # back so this request's writes land on the live copy
+            context = self.active_sessions.setdefault(context.session_id, context)
+            self._session_expiry[context.session_id] = expires_at
+            heapq.heappush(self._expiry_heap, (expires_at, context.session_id))
         return context
     
-    def _create_new_context(self, user_id: str, session_id: str) -> ConversationContext:
+    def _expire_sessions(self, now: float) -> None:
+        """Pop and drop every session whose expiry has passed"""
+        # Another thread already sweeping covers this call too; don't wait for it
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        evicted = []
+        try:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                expires_at, session_id = heapq.heappop(heap)
+                # Entry is stale if the session was refreshed after it was pushed
+                if self._session_expiry.get(session_id) == expires_at:
+                    del self._session_expiry[session_id]
+                    context = self.active_sessions.pop(session_id, None)
+                    if context is not None:
+                        evicted.append(context)
+        finally:
+            self._sweep_lock.release()
+        
+        # Cold-store writes happen outside the lock so touches never wait on the database
+        if self.cold_store is not None:
+            for context in evicted:
+                self.cold_store.put(context)
+    
+    def _create_new_context(self, user_id: str, session_id: str,
+                            now: Optional[timezone.datetime] = None) -> ConversationContext:
         """Create new conversation context"""
         return ConversationContext(
             user_id=user_id,
@@ -75,8 +408,7 @@ class DialogueManager:
             current_state=ConversationState.IDLE,
             current_intent=None,
             pending_task_data={},
-            conversation_history=[],
-            last_interaction=timezone.now(),
+            last_interaction=now or timezone.now(),
             clarification_needed=None,
             suggested_actions=[]
         )
@@ -84,56 +416,63 @@ class DialogueManager:
     def process_user_input(self, user_input: str, user_id: str, 
                           jarvis_response: Dict[str, Any], 
                           session_id: str = None) -> Dict[str, Any]:
-        """Process user input with context awareness"""
-        
-        context = self.get_or_create_context(user_id, session_id)
+        """Process user input with context awareness
         
-        # Add to conversation history
-        context.conversation_history.append({
-            "timestamp": timezone.now().isoformat(),
-            "user_input": user_input,
-            "user_id": user_id
-        })
+        The manager takes ownership of jarvis_response: handlers add their
+        keys to it in place and return it rather than copying it per turn.
+        Pass a copy if the caller still needs the original dict.
+        """
         
         # Classify intent from jarvis response
         intent = self._classify_intent(jarvis_response, user_input)
+        
+        # Casual chat with no dialogue state to manage passes jarvis_response through
+        # unchanged, so skip building a context for it
+        if intent == UserIntent.CASUAL_CHAT and self._is_stateless_session(session_id):
+            self.fast_path_hits += 1
+            return jarvis_response
+        
+        # One clock read per turn, shared by the context and both history entries
+        now = timezone.now()
+        now_iso = now.isoformat()
+        
+        context = self.get_or_create_context(user_id, session_id, now=now)
+        
+        # Add to conversation history
+        context.append_history(now_iso, "user", user_input)
         context.current_intent = intent
         
         # Determine next state and actions
         response = self._process_state_transition(context, jarvis_response, user_input)
         
         # Update context
-        context.last_interaction = timezone.now()
-        context.conversation_history.append({
-            "timestamp": timezone.now().isoformat(),
-            "ai_response": response.get("ai_response", ""),
-            "state": context.current_state.value
-        })
+        context.last_interaction = now
+        ai_text = response.get("ai_response", "")
+        state_value = _STATE_VAL[context.current_state]
+        context.append_history(now_iso, "assistant", ai_text, state_value)
+        
+        if self.store is not None:
+            self.store.put(context)
+            self.store.append_history(
+                context.session_id,
+                {"timestamp": now_iso, "role": "user", "text": user_input, "state": ""},
+                {"timestamp": now_iso, "role": "assistant", "text": ai_text, "state": state_value}
+            )
         
         return response
     
+    def _is_stateless_session(self, session_id: Optional[str]) -> bool:
+        """True if the session cannot have any prior dialogue state"""
+        if not session_id:
+            return True  # A fresh session id would be generated for this turn
+        if session_id in self.active_sessions:
+            return False
+        # A shared or cold store may hold state this worker hasn't seen
+        return self.store is None and self.cold_store is None
+    
     def _classify_intent(self, jarvis_response: Dict[str, Any], user_input: str) -> UserIntent:
         """Classify user intent from jarvis response and input"""
-        if jarvis_response.get("should_create_task"):
-            return UserIntent.CREATE_TASK
-        
-        # Pattern matching for other intents
-        user_input_lower = user_input.lower()
-        
-        if any(word in user_input_lower for word in ["schedule", "book", "plan"]):
-            return UserIntent.SCHEDULE_EVENT
-        elif any(word in user_input_lower for word in ["remind", "reminder", "alert"]):
-            return UserIntent.CREATE_REMINDER
-        elif any(word in user_input_lower for word in ["what", "when", "show", "list"]):
-            return UserIntent.QUERY_SCHEDULE
-        elif any(word in user_input_lower for word in ["change", "modify", "update", "edit"]):
-            return UserIntent.MODIFY_TASK
-        elif any(word in user_input_lower for word in ["delete", "remove", "cancel"]):
-            return UserIntent.DELETE_TASK
-        elif any(word in user_input_lower for word in ["suggest", "recommend", "help", "ideas"]):
-            return UserIntent.GET_SUGGESTIONS
-        else:
-            return UserIntent.CASUAL_CHAT
+        return _classify_cached(bool(jarvis_response.get("should_create_task")), user_input.lower())
     
     def _process_state_transition(self, context: ConversationContext, 
                                  jarvis_response: Dict[str, Any], 
@@ -177,38 +516,39 @@ class DialogueManager:
                 task_data = jarvis_response["task"]
                 
                 # Check if critical details are missing
-                missing_details = self._check_missing_details(task_data)
+                missing_detail = self._first_missing(task_data)
                 
-                if missing_details:
+                if missing_detail:
                     context.current_state = ConversationState.COLLECTING_TASK_DETAILS
                     context.pending_task_data = task_data
-                    context.clarification_needed = missing_details[0]  # Ask for first missing detail
+                    context._summary_cache = None
+                    context.clarification_needed = missing_detail  # Ask for first missing detail
                     
-                    return {
-                        **jarvis_response,
-                        "ai_response": f"{jarvis_response.get('ai_response', '')} {self._generate_clarification_question(missing_details[0])}",
-                        "state": context.current_state.value,
+                    jarvis_response.update({
+                        "ai_response": f"{jarvis_response.get('ai_response', '')} {self._generate_clarification_question(missing_detail)}",
+                        "state": _STATE_VAL[context.current_state],
                         "needs_clarification": True,
-                        "missing_detail": missing_details[0]
-                    }
+                        "missing_detail": missing_detail
+                    })
+                    return jarvis_response
                 else:
                     # Task is complete, check for conflicts
                     context.current_state = ConversationState.CONFIRMING_SCHEDULE
-                    return {
-                        **jarvis_response,
+                    jarvis_response.update({
                         "ai_response": f"{jarvis_response.get('ai_response', '')} Should I go ahead and schedule this?",
-                        "state": context.current_state.value,
+                        "state": _STATE_VAL[context.current_state],
                         "requires_confirmation": True
-                    }
+                    })
+                    return jarvis_response
             else:
                 # No task data extracted, need more details
                 context.current_state = ConversationState.CLARIFYING_INTENT
-                return {
-                    **jarvis_response,
+                jarvis_response.update({
                     "ai_response": "I'd like to help you create a task. Could you tell me more about what you need to do?",
-                    "state": context.current_state.value,
+                    "state": _STATE_VAL[context.current_state],
                     "needs_clarification": True
-                }
+                })
+                return jarvis_response
         
         elif intent == UserIntent.QUERY_SCHEDULE:
             # Handle schedule queries immediately
@@ -231,6 +571,7 @@ class DialogueManager:
         if jarvis_response.get("task"):
             new_data = jarvis_response["task"]
             context.pending_task_data.update(new_data)
+            context._summary_cache = None
         
         # Extract specific details from user input based on what we're asking for
         detail_needed = context.clarification_needed
@@ -238,19 +579,20 @@ class DialogueManager:
         
         if extracted_value:
             context.pending_task_data[detail_needed] = extracted_value
+            context._summary_cache = None
         
         # Check if we still need more details
-        missing_details = self._check_missing_details(context.pending_task_data)
+        missing_detail = self._first_missing(context.pending_task_data)
         
-        if missing_details:
+        if missing_detail:
             # Still need more details
-            context.clarification_needed = missing_details[0]
+            context.clarification_needed = missing_detail
             return {
                 "success": True,
-                "ai_response": f"Great! {self._generate_clarification_question(missing_details[0])}",
-                "state": context.current_state.value,
+                "ai_response": f"Great! {self._generate_clarification_question(missing_detail)}",
+                "state": _STATE_VAL[context.current_state],
                 "needs_clarification": True,
-                "missing_detail": missing_details[0],
+                "missing_detail": missing_detail,
                 "collected_so_far": context.pending_task_data
             }
         else:
@@ -262,8 +604,8 @@ class DialogueManager:
                 "success": True,
                 "should_create_task": True,
                 "task": context.pending_task_data,
-                "ai_response": f"Perfect! I have all the details. Here's what I'll schedule: {self._summarize_task(context.pending_task_data)}. Should I go ahead and create this?",
-                "state": context.current_state.value,
+                "ai_response": f"Perfect! I have all the details. Here's what I'll schedule: {self._summarize_task(context.pending_task_data, context)}. Should I go ahead and create this?",
+                "state": _STATE_VAL[context.current_state],
                 "requires_confirmation": True
             }
     
@@ -272,9 +614,10 @@ class DialogueManager:
                                     user_input: str) -> Dict[str, Any]:
         """Handle schedule confirmation"""
         
-        user_input_lower = user_input.lower()
+        words = _WORD_RE.findall(user_input.lower())
+        tokens = set(words)
         
-        if any(word in user_input_lower for word in ["yes", "ok", "sure", "go ahead", "confirm"]):
+        if not _YES_TOKENS.isdisjoint(tokens) or not _YES_BIGRAMS.isdisjoint(zip(words, words[1:])):
             # User confirmed, proceed with task creation
             context.current_state = ConversationState.IDLE
             
@@ -283,20 +626,21 @@ class DialogueManager:
                 "should_create_task": True,
                 "task": context.pending_task_data,
                 "ai_response": "Perfect! I've scheduled that for you. Is there anything else I can help you with?",
-                "state": context.current_state.value,
+                "state": _STATE_VAL[context.current_state],
                 "task_confirmed": True
             }
         
-        elif any(word in user_input_lower for word in ["no", "cancel", "wait", "not yet"]):
+        elif not _NO_TOKENS.isdisjoint(tokens):
             # User cancelled
             context.current_state = ConversationState.IDLE
             context.pending_task_data = {}
+            context._summary_cache = None
             
             return {
                 "success": True,
                 "should_create_task": False,
                 "ai_response": "No problem! I've cancelled that. Let me know if you'd like to try again or if there's anything else I can help with.",
-                "state": context.current_state.value,
+                "state": _STATE_VAL[context.current_state],
                 "task_cancelled": True
             }
         
@@ -307,118 +651,125 @@ class DialogueManager:
             return {
                 "success": True,
                 "ai_response": "I understand you'd like to make some changes. What would you like to modify?",
-                "state": context.current_state.value,
+                "state": _STATE_VAL[context.current_state],
                 "needs_clarification": True
             }
     
     def _check_missing_details(self, task_data: Dict[str, Any]) -> List[str]:
         """Check what critical details are missing from task data"""
-        missing = []
-        
-        if not task_data.get("name") or len(task_data.get("name", "").strip()) < 3:
-            missing.append("name")
-        
-        if not task_data.get("estimated_duration_minutes"):
-            missing.append("duration")
-        
-        # Only require deadline for high priority tasks
-        if task_data.get("base_priority", 3) <= 2 and not task_data.get("deadline"):
-            missing.append("deadline")
-        
-        return missing
+        return [detail for detail, is_present in _REQUIRED_DETAILS if not is_present(task_data)]
+    
+    def _first_missing(self, task_data: Dict[str, Any]) -> Optional[str]:
+        """Return the first missing critical detail, or None if the task is complete"""
+        for detail, is_present in _REQUIRED_DETAILS:
+            if not is_present(task_data):
+                return detail
+        return None
     
     def _generate_clarification_question(self, detail_type: str) -> str:
         """Generate clarification questions for missing details"""
-        questions = {
-            "name": "What would you like to call this task?",
-            "duration": "How long do you think this will take?",
-            "deadline": "When does this need to be completed?",
-            "category": "What category would this fall under?",
-            "priority": "How important is this task (high, medium, or low priority)?"
-        }
-        
-        return questions.get(detail_type, f"Could you provide more details about {detail_type}?")
+        question = _CLARIFICATION_QUESTIONS.get(detail_type)
+        return question if question is not None else _CLARIFICATION_FALLBACK % detail_type
     
     def _extract_specific_detail(self, user_input: str, detail_type: str) -> Any:
         """Extract specific detail from user input"""
         if detail_type == "duration":
             # Look for time expressions
-            import re
-            time_patterns = [
-                r'(\d+)\s*hours?',
-                r'(\d+)\s*hrs?',
-                r'(\d+)\s*minutes?',
-                r'(\d+)\s*mins?'
-            ]
-            
-            for pattern in time_patterns:
-                match = re.search(pattern, user_input.lower())
-                if match:
-                    value = int(match.group(1))
-                    if 'hour' in pattern or 'hr' in pattern:
-                        return value * 60  # Convert to minutes
-                    else:
-                        return value
+            match = _DURATION_RE.search(user_input)
+            if match:
+                value = int(match.group(1))
+                if match.group(2).lower().startswith(('hour', 'hr')):
+                    return value * 60  # Convert to minutes
+                return value
         
         elif detail_type == "name":
             # If user input looks like a task name, use it
-            if len(user_input.strip()) > 3 and not any(word in user_input.lower() for word in ["when", "how", "what", "where"]):
-                return user_input.strip()
+            stripped = user_input.strip()
+            if len(stripped) > 3 and _QUESTION_WORDS.isdisjoint(_WORD_RE.findall(stripped.lower())):
+                return stripped
         
         return None
     
-    def _summarize_task(self, task_data: Dict[str, Any]) -> str:
-        """Generate a summary of the task"""
+    def _summarize_task(self, task_data: Dict[str, Any],
+                        context: Optional[ConversationContext] = None) -> str:
+        """Generate a summary of the task, reusing the context's cached summary if data is unchanged"""
+        key = None
+        if context is not None:
+            try:
+                key = hash(tuple(sorted(task_data.items())))
+            except TypeError:
+                key = None  # Unhashable values (lists, dicts) - skip caching
+            
+            cached = context._summary_cache
+            if key is not None and cached is not None and cached[0] == key:
+                self.summary_cache_hits += 1
+                return cached[1]
+            self.summary_cache_misses += 1
+        
         name = task_data.get("name", "Unnamed task")
         duration = task_data.get("estimated_duration_minutes", 60)
         priority = task_data.get("base_priority", 3)
         
-        priority_text = ["", "critical", "high", "medium", "low", "very low"][priority]
+        priority_text = _PRIORITY_TEXT[priority]
         
         summary = f"'{name}' ({duration} minutes, {priority_text} priority)"
         
         if task_data.get("deadline"):
             summary += f" due {task_data['deadline']}"
         
+        if key is not None:
+            context._summary_cache = (key, summary)
+        
         return summary
     
     def _generate_schedule_query_response(self, context: ConversationContext, 
                                         jarvis_response: Dict[str, Any]) -> Dict[str, Any]:
         """Generate response for schedule queries"""
         # This would integrate with your schedule engine to get current schedule
-        return {
-            **jarvis_response,
+        jarvis_response.update({
             "ai_response": "Here's your current schedule... (integrate with schedule query logic)",
             "schedule_query": True
-        }
+        })
+        return jarvis_response
     
     def _generate_suggestions_response(self, context: ConversationContext, 
                                      jarvis_response: Dict[str, Any]) -> Dict[str, Any]:
         """Generate suggestions for the user"""
         context.current_state = ConversationState.IDLE  # Return to idle after suggestions
         
-        return {
-            **jarvis_response,
+        jarvis_response.update({
             "ai_response": "Based on your schedule and patterns, here are some suggestions... (integrate with suggestion engine)",
             "suggestions_provided": True
-        }
+        })
+        return jarvis_response
     
     def get_context_summary(self, session_id: str) -> Dict[str, Any]:
         """Get summary of current conversation context"""
         if session_id in self.active_sessions:
             context = self.active_sessions[session_id]
             return {
-                "state": context.current_state.value,
-                "intent": context.current_intent.value if context.current_intent else None,
+                "state": _STATE_VAL[context.current_state],
+                "intent": _INTENT_VAL[context.current_intent],
                 "pending_data": context.pending_task_data,
-                "history_length": len(context.conversation_history),
-                "last_interaction": context.last_interaction.isoformat()
+                "history_length": len(context.hist_ts),
+                "last_interaction": context.last_interaction.isoformat(),
+                "intent_cache": _classify_cached.cache_info()._asdict(),
+                "summary_cache": {
+                    "hits": self.summary_cache_hits,
+                    "misses": self.summary_cache_misses
+                },
+                "fast_path_hits": self.fast_path_hits
             }
         return {"error": "Session not found"}
     
     def clear_context(self, session_id: str) -> bool:
         """Clear conversation context"""
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
-            return True
+        if self.store is not None:
+            self.store.delete(session_id)
+        if self.cold_store is not None:
+            self.cold_store.delete(session_id)
+        with self._sweep_lock:
+            if self.active_sessions.pop(session_id, None) is not None:
+                self._session_expiry.pop(session_id, None)
+                return True
         return False
\ No newline at end of file
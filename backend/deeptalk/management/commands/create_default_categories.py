@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from deeptalk.models import TaskCategory, DeepTalkUser
+from task_manager.models import TaskCategory
 
 class Command(BaseCommand):
     help = 'Create default system task categories'
@@ -50,31 +50,39 @@ class Command(BaseCommand):
             }
         ]
 
-        created_count = 0
-        for cat_data in default_categories:
-            category, created = TaskCategory.objects.get_or_create(
+        names = [cat_data['name'] for cat_data in default_categories]
+        existing = set(
+            TaskCategory.objects.filter(
+                is_system_category=True,
+                name__in=names
+            ).values_list('name', flat=True)
+        )
+
+        to_create = [
+            TaskCategory(
+                user_id=None,
                 name=cat_data['name'],
+                color_hex=cat_data['color_hex'],
+                icon=cat_data['icon'],
+                default_duration=cat_data['default_duration'],
+                default_priority=cat_data['default_priority'],
                 is_system_category=True,
-                defaults={
-                    'user_id': None,
-                    'color_hex': cat_data['color_hex'],
-                    'icon': cat_data['icon'],
-                    'default_duration': cat_data['default_duration'],
-                    'default_priority': cat_data['default_priority'],
-                    'is_system_category': True,
-                }
             )
-            
-            if created:
-                created_count += 1
+            for cat_data in default_categories
+            if cat_data['name'] not in existing
+        ]
+        TaskCategory.objects.bulk_create(to_create, ignore_conflicts=True)
+
+        for name in names:
+            if name in existing:
                 self.stdout.write(
-                    self.style.SUCCESS(f'Created category: {category.name}')
+                    self.style.WARNING(f'Category already exists: {name}')
                 )
             else:
                 self.stdout.write(
-                    self.style.WARNING(f'Category already exists: {category.name}')
+                    self.style.SUCCESS(f'Created category: {name}')
                 )
 
         self.stdout.write(
-            self.style.SUCCESS(f'Successfully created {created_count} default categories')
-        )
\ No newline at end of file
+            self.style.SUCCESS(f'Successfully created {len(to_create)} default categories')
+        )
@@ -0,0 +1,34 @@
+import deeptalk.models
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deeptalk', '0002_add_scheduling_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationContextSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.CharField(max_length=255, unique=True)),
+                ('user_id', models.CharField(max_length=255)),
+                ('state', models.CharField(max_length=50)),
+                ('intent', models.CharField(blank=True, max_length=50)),
+                ('pending_task_data', models.JSONField(default=deeptalk.models.default_dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('clarification_needed', models.CharField(blank=True, max_length=50)),
+                ('history', models.JSONField(default=deeptalk.models.default_list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'deeptalk_context_snapshots',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='conversationcontextsnapshot',
+            index=models.Index(fields=['user_id', 'session_id'], name='idx_ctx_snapshot_user_session'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+import deeptalk.models
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deeptalk', '0003_conversationcontextsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPatternSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patterns', models.JSONField(default=deeptalk.models.default_dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('dirty', models.BooleanField(default=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pattern_snapshot', to='deeptalk.deeptalkuser')),
+            ],
+            options={
+                'db_table': 'deeptalk_user_pattern_snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+def merge_duplicate_system_categories(apps, schema_editor):
+    """Keep the oldest system category per name and repoint tasks at it before the constraint is added"""
+    TaskCategory = apps.get_model('deeptalk', 'TaskCategory')
+    Task = apps.get_model('deeptalk', 'Task')
+
+    kept = {}
+    duplicates = {}
+    for category_id, name in (
+        TaskCategory.objects.filter(is_system_category=True)
+        .order_by('created_at', 'id')
+        .values_list('id', 'name')
+    ):
+        if name in kept:
+            duplicates[category_id] = kept[name]
+        else:
+            kept[name] = category_id
+
+    for duplicate_id, kept_id in duplicates.items():
+        Task.objects.filter(category_id=duplicate_id).update(category_id=kept_id)
+    TaskCategory.objects.filter(id__in=list(duplicates)).delete()
+
+
+class Migration(migrations.Migration):
+
+    # task_categories is created by this app's migrations, so the
+    # task_manager.TaskCategory constraint is shipped from here
+    dependencies = [
+        ('deeptalk', '0004_userpatternsnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_system_categories, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='taskcategory',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(is_system_category=True),
+                fields=('name',),
+                name='uniq_system_category_name',
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('deeptalk', '0005_taskcategory_uniq_system_category_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userpatternsnapshot',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,7 +1,11 @@
 # gmail-oauth-project\backend\deeptalk\models.py
 import uuid
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
@@ -54,3 +58,59 @@ class DeepTalkUser(models.Model):
     def soft_delete(self):
         self.deleted_at = timezone.now()
         self.save()
+
+
+class ConversationContextSnapshot(models.Model):
+    """Cold copy of a dialogue context evicted from a worker's active sessions"""
+    session_id = models.CharField(max_length=255, unique=True)
+    user_id = models.CharField(max_length=255)
+    state = models.CharField(max_length=50)
+    intent = models.CharField(max_length=50, blank=True)
+    pending_task_data = models.JSONField(default=default_dict, encoder=DjangoJSONEncoder)
+    clarification_needed = models.CharField(max_length=50, blank=True)
+    history = models.JSONField(default=default_list)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'deeptalk_context_snapshots'
+        indexes = [
+            models.Index(fields=['user_id', 'session_id'], name='idx_ctx_snapshot_user_session'),
+        ]
+    
+    def __str__(self):
+        return f"{self.session_id} ({self.state})"
+
+
+class UserPatternSnapshot(models.Model):
+    """Last PersonalizationEngine.analyze_user_patterns result for a user"""
+    user = models.OneToOneField(DeepTalkUser, on_delete=models.CASCADE, related_name='pattern_snapshot')
+    patterns = models.JSONField(default=default_dict, encoder=DjangoJSONEncoder)
+    refreshed_at = models.DateTimeField(auto_now=True)
+    dirty = models.BooleanField(default=True)  # Set when the user's tasks change
+    generation = models.PositiveIntegerField(default=0)  # Bumped on every task change
+    
+    class Meta:
+        db_table = 'deeptalk_user_pattern_snapshots'
+    
+    def __str__(self):
+        return f"Patterns for {self.user_id} ({'dirty' if self.dirty else 'fresh'})"
+
+
+@receiver([post_save, post_delete], sender='task_manager.Task', dispatch_uid='deeptalk_pattern_snapshot_dirty')
+def mark_pattern_snapshot_dirty(sender, instance, **kwargs):
+    """Flag the owner's pattern snapshot for recomputation with a single UPDATE"""
+    UserPatternSnapshot.objects.filter(user_id=instance.user_id).update(
+        dirty=True, generation=models.F('generation') + 1
+    )
+
+
+def completion_patterns_key(user_id) -> str:
+    """Cache key of a user's reminder completion patterns"""
+    return f"deeptalk:completion-patterns:{user_id}"
+
+
+@receiver(post_save, sender='task_manager.Task', dispatch_uid='deeptalk_completion_patterns_reset')
+def reset_completion_patterns(sender, instance, **kwargs):
+    """Drop the owner's cached completion patterns once a task is completed"""
+    if instance.status == 'completed':
+        cache.delete(completion_patterns_key(instance.user_id))
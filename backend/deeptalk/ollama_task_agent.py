@@ -1,18 +1,28 @@
 # backend/deeptalk/ollama_task_agent.py - Updated for optimized models
 
+import asyncio
+import bisect
+import hashlib
 import json
+import os
 import requests
 import re
+import string
+import threading
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from langchain.llms.base import LLM
-from langchain.schema import BaseMessage, HumanMessage, SystemMessage
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field, validator
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from pydantic import BaseModel, Field
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from decimal import Decimal
+from enum import IntEnum
+from functools import lru_cache
+from time import monotonic
 from .models import Task, TaskCategory, DeepTalkUser
 from .models import TimeBlock, UserPreferences
 from datetime import datetime, time, timedelta
@@ -21,15 +31,91 @@ import logging
 from .serializers import (
     TaskSerializer
 )
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
-class ActionIntent:
-    CREATE_TASK = "create_task"
-    CONTEXT_RESPONSE = "context_response"
-    READ_TASK = "read_task" 
-    UPDATE_TASK = "update_task"
-    DELETE_TASK = "delete_task"
-    GENERAL_CHAT = "general_chat"
+# JSON codec for Ollama traffic and prompt payloads: orjson when installed, stdlib json otherwise
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+    
+    def _json_dumps_indented(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+else:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    
+    def _json_dumps_indented(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+# One-pass JSON clean-up for LLM output. String literals are matched first and kept
+# verbatim, so "//" inside a value (e.g. a URL) is not mistaken for a comment; line and
+# block comments and commas before a closing brace/bracket (comments allowed between) are dropped.
+_JSON_NOISE_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"'
+    r'|//[^\n]*'
+    r'|/\*.*?\*/'
+    r'|,(?=(?:\s|//[^\n]*|/\*.*?\*/)*[}\]])',
+    re.DOTALL
+)
+
+
+# Inputs that are nothing but a greeting, thanks or a help request get a canned reply
+# without an LLM call; the group that matched selects the reply
+_QUICK_REPLY_RE = re.compile(
+    r'^\s*(?:(?P<greeting>hi|hello|hey)|(?P<thanks>thanks?|thank\s+you)|(?P<help>help|what\s+can\s+you\s+do))'
+    r'(?:[\s,]+jarvis)?[\s!.?]*$',
+    re.IGNORECASE
+)
+_QUICK_REPLIES = {
+    "greeting": "Hello! I'm Jarvis, your task management assistant. How can I help you today?",
+    "thanks": "You're welcome! I'm always happy to help with your tasks.",
+    "help": "I can help you create, manage, and organize your tasks. Just tell me what you need to do!",
+}
+
+# Task requests up to this many words get the template confirmation instead of an LLM one
+_SHORT_TASK_INPUT_WORDS = 5
+
+# Sampling temperature for prompts whose reply is parsed as JSON; low enough that
+# OllamaLLM reuses the reply for a repeated prompt
+EXTRACTION_TEMPERATURE = 0.1
+
+# End of a sentence in streamed text; the trailing whitespace rules out decimals like "3.5"
+_SENTENCE_END_RE = re.compile(r'[.!?]+\s')
+
+
+def _keep_json_strings(match: re.Match) -> str:
+    text = match.group()
+    return text if text[0] == '"' else ''
+
+
+# Command prefixes stripped from a task name, applied in this order
+_TASK_PREFIX_RES = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'^(create|add|new|make)\s+(a\s+)?task\s+(to\s+)?',
+    r'^remind\s+me\s+to\s+',
+    r'^schedule\s+',
+    r'^i\s+(need|have|should|must)\s+to\s+'
+))
+
+class ActionIntent(IntEnum):
+    """Action intents; compared as ints internally, sent over the API via _ACTION_LABELS"""
+    GENERAL_CHAT = 0
+    CREATE_TASK = 1
+    CONTEXT_RESPONSE = 2
+    READ_TASK = 3
+    UPDATE_TASK = 4
+    DELETE_TASK = 5
 
     # def _analyze_action_intent(self, user_input: str, conversation_context: Dict = None) -> Dict[str, Any]:
     #     """Analyze what the user wants to do and if we have enough info"""
@@ -136,6 +222,116 @@ class ActionIntent:
     #     else:
     #         return "Could you provide a bit more detail about what you need?"
 
+
+def _keyword_matcher(groups):
+    """Compile (value, keywords) groups, listed in precedence order, into one alternation.
+    
+    Keywords match as plain substrings, as the any(word in text ...) scans they replace did.
+    Returns (pattern, {keyword: (rank, value)}).
+    """
+    table = {}
+    for rank, (value, keywords) in enumerate(groups):
+        for keyword in keywords:
+            table.setdefault(keyword, (rank, value))
+    # Longest first so a keyword is never shadowed by a shorter one at the same position
+    alternation = '|'.join(re.escape(keyword) for keyword in sorted(table, key=len, reverse=True))
+    return re.compile(alternation), table
+
+
+def _best_keyword_value(pattern, table, text: str, default):
+    """Value of the highest-precedence keyword found in text, scanning it once"""
+    best = None
+    for match in pattern.finditer(text):
+        hit = table[match.group()]
+        if best is None or hit[0] < best[0]:
+            best = hit
+            if hit[0] == 0:
+                break  # Nothing outranks the first group
+    return best[1] if best is not None else default
+
+
+# Wire names for API responses ("create_task", ...), unchanged from the old string constants
+_ACTION_LABELS = {intent: intent.name.lower() for intent in ActionIntent}
+
+_ACTION_RE, _ACTION_TABLE = _keyword_matcher((
+    (ActionIntent.CREATE_TASK, ('create', 'add', 'new', 'remind', 'schedule', 'plan', 'task',
+                                'need to', 'have to', 'should', 'must', 'todo')),
+    (ActionIntent.READ_TASK, ('show', 'list', 'find', 'what')),
+    (ActionIntent.UPDATE_TASK, ('update', 'change', 'modify', 'edit')),
+    (ActionIntent.DELETE_TASK, ('delete', 'remove', 'cancel')),
+))
+
+_PRIORITY_RE, _PRIORITY_TABLE = _keyword_matcher((
+    (1, ('urgent', 'important', 'critical')),
+    (2, ('high',)),
+    (4, ('low', 'sometime')),
+))
+
+
+# Chat inputs repeat a lot ("hi", "show my tasks"), so the keyword work below is cached.
+# Both functions are pure in their arguments; anything time-dependent is applied by the caller.
+@lru_cache(maxsize=2048)
+def _classify_action(user_lower: str) -> ActionIntent:
+    """Action intent for lowercased input: create > read > update > delete > general chat"""
+    return _best_keyword_value(_ACTION_RE, _ACTION_TABLE, user_lower, ActionIntent.GENERAL_CHAT)
+
+
+# Fixed offsets, built once rather than per request
+_ONE_DAY = timedelta(days=1)
+_ONE_WEEK = timedelta(days=7)
+_EIGHT_HOURS = timedelta(hours=8)
+_LUNCH_AFTER = timedelta(hours=4)
+
+# Timestamp format used in LLM prompts
+_PROMPT_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S %Z"
+
+# Deadline keywords -> offset from now, in precedence order
+_DEADLINE_KEYWORDS = (
+    (_ONE_DAY, ('tomorrow',)),
+    (_ONE_WEEK, ('next week',)),
+    (_EIGHT_HOURS, ('today',)),
+)
+
+# Priority and deadline keywords share one alternation so both come out of a single scan
+_TASK_HINT_TABLE = {keyword: ('priority', rank, value) for keyword, (rank, value) in _PRIORITY_TABLE.items()}
+_TASK_HINT_TABLE.update(
+    (keyword, ('deadline', rank, value))
+    for rank, (value, keywords) in enumerate(_DEADLINE_KEYWORDS) for keyword in keywords
+)
+_TASK_HINT_RE = re.compile('|'.join(
+    re.escape(keyword) for keyword in sorted(_TASK_HINT_TABLE, key=len, reverse=True)
+))
+
+
+def _scan_priority_deadline(user_lower: str) -> Tuple[int, Optional[timedelta]]:
+    """(priority, deadline offset) from one pass over lowercased input"""
+    best = {}
+    for match in _TASK_HINT_RE.finditer(user_lower):
+        kind, rank, value = _TASK_HINT_TABLE[match.group()]
+        current = best.get(kind)
+        if current is None or rank < current[0]:
+            best[kind] = (rank, value)
+    priority = best["priority"][1] if "priority" in best else 3
+    deadline_offset = best["deadline"][1] if "deadline" in best else None
+    return priority, deadline_offset
+
+
+@lru_cache(maxsize=2048)
+def _extract_task_fields(user_input: str, user_lower: str) -> Tuple[str, int, Optional[timedelta]]:
+    """(task name, priority, deadline offset from now) for a task request"""
+    task_name = user_input
+    
+    # Clean up common patterns
+    for pattern in _TASK_PREFIX_RES:
+        task_name = pattern.sub('', task_name).strip()
+    
+    # Limit length
+    task_name = task_name[:100]
+    
+    priority, deadline_offset = _scan_priority_deadline(user_lower)
+    
+    return task_name, priority, deadline_offset
+
 class TaskExtraction(BaseModel):
     """Structured output for extracted task information - optimized for EDF/HPF"""
     name: str = Field(description="Clear, concise task name")
@@ -184,21 +380,73 @@ class JarvisResponse(BaseModel):
     conversational_response: str = Field(description="Natural language response to the user")
     task_data: Optional[TaskExtraction] = Field(description="Extracted task information if should_create_task is True")
 
+# Validator for LLM JSON built once at import. With pydantic 2 a TypeAdapter parses and
+# validates the raw JSON in one step; pydantic 1 falls back to parse_raw.
+try:
+    from pydantic import TypeAdapter
+    _parse_jarvis_response = TypeAdapter(JarvisResponse).validate_json
+except ImportError:
+    _parse_jarvis_response = JarvisResponse.parse_raw
+
 class OllamaLLM:
     """Fixed LLM wrapper for Ollama"""
     
+    # No per-instance __dict__: one client is created per agent
+    __slots__ = (
+        "model", "ollama_url", "temperature", "available", "session", "_req_template",
+        "_response_cache", "_response_cache_lock", "response_cache_size", "cache_max_temperature"
+    )
+    
     def __init__(self, model="llama3.2:latest", ollama_url="http://localhost:11434", temperature=0.7):
         self.model = model
         self.ollama_url = ollama_url
         self.temperature = temperature
+        # One pooled keep-alive session per client instead of a new connection per call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # LRU of prompt digest -> response; only used when sampling is near-deterministic
+        self._response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        self.response_cache_size = 256
+        self.cache_max_temperature = 0.3
         self.available = self._test_connection()
+        # Fixed part of every /api/generate body; built after _test_connection may switch model
+        self._req_template = {
+            "model": self.model,
+            "stream": False,
+            "options": {
+                "temperature": self.temperature,
+                "top_p": 0.9,
+                "top_k": 40
+            }
+        }
+    
+    def _cache_key(self, prompt: str, temperature: float) -> Optional[bytes]:
+        """Digest of (model, temperature, prompt), or None if responses shouldn't be reused"""
+        if temperature > self.cache_max_temperature:
+            return None
+        material = f"{self.model}\0{temperature}\0{prompt}".encode()
+        return hashlib.blake2b(material, digest_size=16).digest()
+    
+    def _request_body(self, prompt: str, temperature: float) -> Dict[str, Any]:
+        """/api/generate body for prompt, from the fixed template"""
+        body = {**self._req_template, "prompt": prompt}
+        if temperature != self.temperature:
+            body["options"] = {**body["options"], "temperature": temperature}
+        return body
     
     def _test_connection(self):
         """Test if Ollama is available"""
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.ollama_url}/api/tags", timeout=5)
             if response.status_code == 200:
-                models_data = response.json()
+                models_data = _json_loads(response.content)
                 available_models = [m.get('name') for m in models_data.get('models', [])]
                 
                 if self.model not in available_models and available_models:
@@ -210,30 +458,42 @@ class OllamaLLM:
             logger.warning(f"Ollama not available: {e}")
         return False
     
-    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
-        """Call Ollama API - FIXED VERSION"""
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, temperature: Optional[float] = None) -> str:
+        """Call Ollama API - FIXED VERSION
+        
+        temperature overrides the client's for this call; replies sampled at or
+        below cache_max_temperature are reused for a repeated prompt.
+        """
         if not self.available:
             return "I'm having trouble connecting to my AI brain right now, but I can still help!"
         
+        if temperature is None:
+            temperature = self.temperature
+        cache_key = self._cache_key(prompt, temperature)
+        if cache_key is not None:
+            with self._response_cache_lock:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    self._response_cache.move_to_end(cache_key)
+                    return cached
+        
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": self.temperature,
-                        "top_p": 0.9,
-                        "top_k": 40
-                    }
-                },
+                data=_json_dumps(self._request_body(prompt, temperature)),
+                headers=_JSON_HEADERS,
                 timeout=30  # Increased timeout
             )
             
             if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "")
+                result = _json_loads(response.content)
+                text = result.get("response", "")
+                if cache_key is not None and text:
+                    with self._response_cache_lock:
+                        self._response_cache[cache_key] = text
+                        if len(self._response_cache) > self.response_cache_size:
+                            self._response_cache.popitem(last=False)
+                return text
             else:
                 logger.error(f"Ollama error: {response.status_code}")
                 return ""
@@ -241,26 +501,258 @@ class OllamaLLM:
         except Exception as e:
             logger.error(f"Ollama API error: {str(e)}")
             return ""
+    
+    def _stream(self, prompt: str) -> Iterator[str]:
+        """Yield response fragments as Ollama generates them (stream mode)"""
+        if not self.available:
+            return
+        
+        try:
+            with self.session.post(
+                f"{self.ollama_url}/api/generate",
+                data=_json_dumps({**self._req_template, "prompt": prompt, "stream": True}),
+                headers=_JSON_HEADERS,
+                timeout=30,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"Ollama error: {response.status_code}")
+                    return
+                
+                # One JSON object per line until "done"
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    fragment = chunk.get("response")
+                    if fragment:
+                        yield fragment
+                    if chunk.get("done"):
+                        break
+                
+        except Exception as e:
+            logger.error(f"Ollama API error: {str(e)}")
+    
+    def _call_sentences(self, prompt: str, max_sentences: int = 2) -> str:
+        """Stream a reply and stop generation once max_sentences are complete"""
+        text = ""
+        sentences = 0
+        scan_from = 0
+        stream = self._stream(prompt)
+        try:
+            for fragment in stream:
+                text += fragment
+                for end in _SENTENCE_END_RE.finditer(text, scan_from):
+                    sentences += 1
+                    if sentences >= max_sentences:
+                        return text[:end.end()].strip()
+                    scan_from = end.end()
+                # Only the new tail is scanned next time; a trailing terminator is kept
+                # in case the whitespace that ends its sentence is in the next fragment
+                scan_from = max(scan_from, len(text) - 1)
+        finally:
+            # Closing the generator closes the HTTP response, which cancels generation
+            stream.close()
+        return text
+    
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        """Async variant of _call: runs the pooled blocking call on a worker thread"""
+        return await asyncio.to_thread(self._call, prompt, stop)
+    
+    async def agenerate_many(self, prompts: List[str]) -> List[str]:
+        """Send independent prompts concurrently; results keep the order of prompts"""
+        return await asyncio.gather(*(self._acall(prompt) for prompt in prompts))
 
 def clean_json_response(response_text: str) -> str:
     """Clean JSON response by removing comments and extra formatting"""
-    # Remove JavaScript-style comments (// comment)
-    response_text = re.sub(r'//.*?(?=\n|$)', '', response_text)
-    
-    # Remove C-style comments (/* comment */)
-    response_text = re.sub(r'/\*.*?\*/', '', response_text, flags=re.DOTALL)
+    response_text = response_text.strip()
     
     # Remove code block markers
-    if response_text.strip().startswith("```json"):
-        response_text = response_text.replace("```json", "").replace("```", "").strip()
+    if response_text.startswith("```json"):
+        response_text = response_text.replace("```json", "").replace("```", "")
     
-    # Remove any trailing commas before closing braces/brackets
-    response_text = re.sub(r',(\s*[}\]])', r'\1', response_text)
+    # Remove comments and trailing commas in a single scan
+    response_text = _JSON_NOISE_RE.sub(_keep_json_strings, response_text)
     
     # Clean up extra whitespace
-    response_text = response_text.strip()
+    return response_text.strip()
+
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_first_json(text: str) -> Optional[Any]:
+    """First complete JSON object embedded in text, or None.
+    
+    raw_decode stops at the end of the object, so surrounding prose is never
+    scanned by a greedy regex; each '{' is tried at most once.
+    """
+    start = text.find('{')
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            return obj
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    return None
+
+# Task fields sent to the LLM, headed by the names the schedule prompt refers to:
+# (column, task keys tried in order)
+_TASK_TABLE_COLUMNS = (
+    ("name", ("name",)),
+    ("deadline", ("deadline",)),
+    ("deadline_flexibility_minutes", ("deadline_flexibility_minutes",)),
+    ("estimated_duration_minutes", ("estimated_duration_minutes",)),
+    ("minimum_duration_minutes", ("minimum_duration_minutes",)),
+    ("maximum_duration_minutes", ("maximum_duration_minutes",)),
+    ("base_priority", ("base_priority", "priority")),
+    ("urgency_multiplier", ("urgency_multiplier",)),
+    ("required_energy_level", ("required_energy_level",)),
+    ("category", ("category",)),
+    ("can_be_split", ("can_be_split",)),
+    ("requires_consecutive_time", ("requires_consecutive_time",)),
+    ("preferred_time_of_day", ("preferred_time_of_day",)),
+    ("avoid_time_of_day", ("avoid_time_of_day",)),
+)
+_TASK_TABLE_HEADER = " | ".join(column for column, _ in _TASK_TABLE_COLUMNS)
+_TASK_TABLE_LEGEND = "(base_priority 1=highest..5=lowest, required_energy_level 1=low..5=high, '-' = not set)"
+
+
+def _task_cell(task: Dict, keys: Tuple[str, ...]) -> str:
+    for key in keys:
+        value = task.get(key)
+        if value is not None and value != "" and value != []:
+            if isinstance(value, (list, tuple)):
+                value = ", ".join(map(str, value))
+            return str(value).replace("|", "/")
+    return "-"
+
+
+def _tasks_to_table(tasks: List[Dict]) -> str:
+    """Render tasks as a pipe-delimited table so field names appear once, not once per task"""
+    rows = [_TASK_TABLE_HEADER]
+    rows.extend(
+        " | ".join(_task_cell(task, keys) for _, keys in _TASK_TABLE_COLUMNS)
+        for task in tasks
+    )
+    rows.append(_TASK_TABLE_LEGEND)
+    return "\n".join(rows)
+
+
+class _PrebakedPrompt:
+    """A str.format template split once into literal text and field slots.
+    
+    Fixed fields (e.g. multi-KB format instructions) are folded into the literals up
+    front, so rendering is a single join instead of a Formatter pass over the whole text.
+    """
+    __slots__ = ("_literals", "_fields")
+    
+    def __init__(self, template: str, **fixed: str):
+        literals = [""]
+        fields = []
+        for literal, field_name, _, _ in string.Formatter().parse(template):
+            literals[-1] += literal
+            if field_name is None:
+                continue
+            if field_name in fixed:
+                literals[-1] += fixed[field_name]
+            else:
+                fields.append(field_name)
+                literals.append("")
+        self._literals = tuple(literals)
+        self._fields = tuple(fields)
     
-    return response_text
+    def format(self, **values: str) -> str:
+        parts = [self._literals[0]]
+        for field_name, literal in zip(self._fields, self._literals[1:]):
+            parts.append(values[field_name])
+            parts.append(literal)
+        return "".join(parts)
+
+
+# Prompt templates for the context and schedule prompts
+_CONTEXT_PROMPT_TEMPLATE = """You are Jarvis, processing a conversation about task management with EDF/HPF scheduling focus.
+
+CONVERSATION HISTORY:
+{conversation_history}
+
+NEW USER INPUT: {new_input}
+CURRENT DATE/TIME: {current_datetime}
+
+Consider the conversation context when understanding the user's request. They might be:
+- Clarifying details about a previous request
+- Adding to or modifying something they mentioned before
+- Asking follow-up questions
+
+Focus on extracting scheduling-relevant information:
+- Duration in MINUTES
+- Priority and urgency for HPF algorithm
+- Deadlines for EDF algorithm
+- Scheduling constraints
+
+CRITICAL: Return ONLY valid JSON without any comments, explanations, or code block markers.
+
+{format_instructions}
+
+Return ONLY the JSON object:"""
+
+_SCHEDULE_PROMPT_TEMPLATE = """You are Jarvis, an intelligent scheduling assistant using EDF (Earliest Deadline First) and HPF (Highest Priority First) algorithms.
+
+TASKS TO SCHEDULE:
+{tasks_table}
+
+USER PREFERENCES:
+{user_preferences}
+
+CURRENT DATE/TIME: {current_datetime}
+
+Apply EDF/HPF scheduling principles:
+
+EDF ALGORITHM:
+1. Sort tasks by deadline (earliest first)
+2. Consider deadline_flexibility_minutes for adjustments
+3. Prioritize overdue tasks first
+4. Account for task duration vs time until deadline
+
+HPF ALGORITHM:
+1. Sort tasks by calculated_priority (highest first)
+2. Use base_priority * urgency_multiplier * deadline_factor
+3. Consider category_weight from task categories
+4. Balance high priority with feasibility
+
+SCHEDULING CONSTRAINTS:
+- Respect can_be_split and requires_consecutive_time
+- Use estimated_duration_minutes for time allocation
+- Consider preferred_time_of_day and avoid_time_of_day
+- Account for required_energy_level and user's productive hours
+- Ensure minimum_duration_minutes and maximum_duration_minutes
+
+OPTIMIZATION GOALS:
+1. Minimize deadline violations (EDF priority)
+2. Maximize high-priority task completion (HPF priority)
+3. Optimize time block utilization
+4. Balance workload across time periods
+5. Respect user preferences and constraints
+
+Provide a detailed schedule with:
+- EDF/HPF algorithm application rationale
+- Specific time slots with justification
+- Conflict resolution strategies
+- Buffer time recommendations
+- Priority vs deadline trade-off explanations
+
+Output your schedule as a structured response with algorithm insights."""
+
+# Hand-written response shape for the context prompt. The full JSON schema from
+# PydanticOutputParser is several KB of titles and descriptions; the reply is still
+# validated against JarvisResponse, so this only has to show the model the shape.
+_COMPACT_SCHEMA = """Respond with a JSON object of exactly this shape:
+{"should_create_task": true, "conversational_response": "short reply to the user", "task_data": {"name": "task name", "description": "what the task involves", "base_priority": 3, "urgency_multiplier": 1.0, "estimated_duration_minutes": 60, "minimum_duration_minutes": null, "maximum_duration_minutes": null, "deadline": "YYYY-MM-DDTHH:MM:SS", "preferred_completion_time": null, "category": "work", "location": null, "required_energy_level": 3}}
+Rules: task_data is null when should_create_task is false. base_priority and required_energy_level are 1-5 (priority 1 = highest). Durations are minutes (5-1440). Unknown values are null."""
+
+# Prompts are rendered once here and sent with llm._call directly; there is a single LLM
+# call per request, so an LLMChain would only add callback and coercion overhead
+_CONTEXT_PROMPT = _PrebakedPrompt(_CONTEXT_PROMPT_TEMPLATE, format_instructions=_COMPACT_SCHEMA)
+_SCHEDULE_PROMPT = _PrebakedPrompt(_SCHEDULE_PROMPT_TEMPLATE)
+
 
 class JarvisTaskAgent:
     """Fixed AI Agent for processing natural language"""
@@ -275,6 +767,11 @@ class JarvisTaskAgent:
             ollama_url=self.ollama_url
         )
         
+        # Last healthy health_check result, reused for _health_ttl seconds
+        self._health_ttl = 30.0
+        self._last_ok_ts = 0.0
+        self._last_health = None
+        
         logger.info(f"Jarvis initialized with model: {self.model}, available: {self.llm.available}")
 
     def process_user_input(self, user_input: str, user=None, conversation_context: Dict = None) -> Dict[str, Any]:
@@ -283,24 +780,28 @@ class JarvisTaskAgent:
         if not user_input or not user_input.strip():
             return {
                 "success": True,
-                "action_intent": ActionIntent.GENERAL_CHAT,
+                "action_intent": _ACTION_LABELS[ActionIntent.GENERAL_CHAT],
                 "should_create_task": False,
                 "ai_response": "Hi! What can I help you with today?"
             }
         
         user_input = user_input.strip()
+        # Lowercased once and shared by every keyword check below
+        user_lower = user_input.lower()
         
         # Simple intent detection
-        intent_analysis = self._analyze_action_intent(user_input, conversation_context)
+        intent_analysis = self._analyze_action_intent(user_input, conversation_context, user_lower)
+        
+        action_intent = intent_analysis["action_intent"]
         
-        if intent_analysis["action_intent"] == ActionIntent.CREATE_TASK:
+        if action_intent is ActionIntent.CREATE_TASK:
             # Handle task creation
-            task_data = self._extract_task_data(user_input)
+            task_data = self._extract_task_data(user_input, user_lower)
             ai_response = self._generate_task_response(user_input, task_data)
             
             return {
                 "success": True,
-                "action_intent": ActionIntent.CREATE_TASK,
+                "action_intent": _ACTION_LABELS[ActionIntent.CREATE_TASK],
                 "should_create_task": True,
                 "ai_response": ai_response,
                 "user_input": user_input,
@@ -309,80 +810,42 @@ class JarvisTaskAgent:
         
         else:
             # General conversation
-            ai_response = self._get_conversational_response(user_input)
+            ai_response = self._get_conversational_response(user_input, user_lower)
             
             return {
                 "success": True,
-                "action_intent": intent_analysis["action_intent"],
+                "action_intent": _ACTION_LABELS[action_intent],
                 "should_create_task": False,
                 "ai_response": ai_response,
                 "user_input": user_input
             }
 
-    def _analyze_action_intent(self, user_input: str, conversation_context: Dict = None) -> Dict[str, Any]:
+    async def aprocess(self, inputs: List[str], user=None) -> List[Dict[str, Any]]:
+        """Process independent user inputs concurrently; results keep the order of inputs"""
+        return await asyncio.gather(
+            *(asyncio.to_thread(self.process_user_input, user_input, user) for user_input in inputs)
+        )
+    
+    def process_batch(self, inputs: List[str], user=None) -> List[Dict[str, Any]]:
+        """Sync wrapper around aprocess for views and management commands"""
+        return asyncio.run(self.aprocess(inputs, user))
+
+    def _analyze_action_intent(self, user_input: str, conversation_context: Dict = None,
+                               user_lower: str = None) -> Dict[str, Any]:
         """Analyze what the user wants to do - SIMPLIFIED"""
-        user_lower = user_input.lower()
-        
-        # Check for task creation keywords
-        create_keywords = [
-            'create', 'add', 'new', 'remind', 'schedule', 'plan', 'task',
-            'need to', 'have to', 'should', 'must', 'todo'
-        ]
-        
-        if any(keyword in user_lower for keyword in create_keywords):
-            return {"action_intent": ActionIntent.CREATE_TASK}
-        
-        # Check for other intents
-        elif any(word in user_lower for word in ['show', 'list', 'find', 'what']):
-            return {"action_intent": ActionIntent.READ_TASK}
-        
-        elif any(word in user_lower for word in ['update', 'change', 'modify', 'edit']):
-            return {"action_intent": ActionIntent.UPDATE_TASK}
-        
-        elif any(word in user_lower for word in ['delete', 'remove', 'cancel']):
-            return {"action_intent": ActionIntent.DELETE_TASK}
-        
-        else:
-            return {"action_intent": ActionIntent.GENERAL_CHAT}
+        if user_lower is None:
+            user_lower = user_input.lower()
+        return {"action_intent": _classify_action(user_lower)}
 
-    def _extract_task_data(self, user_input: str) -> Dict:
+    def _extract_task_data(self, user_input: str, user_lower: str = None) -> Dict:
         """Extract task data from user input - SIMPLIFIED"""
+        if user_lower is None:
+            user_lower = user_input.lower()
         
-        # Basic task extraction
-        task_name = user_input
-        
-        # Clean up common patterns
-        patterns_to_remove = [
-            r'^(create|add|new|make)\s+(a\s+)?task\s+(to\s+)?',
-            r'^remind\s+me\s+to\s+',
-            r'^schedule\s+',
-            r'^i\s+(need|have|should|must)\s+to\s+'
-        ]
+        task_name, priority, deadline_offset = _extract_task_fields(user_input, user_lower)
         
-        for pattern in patterns_to_remove:
-            task_name = re.sub(pattern, '', task_name, flags=re.IGNORECASE).strip()
-        
-        # Limit length
-        if len(task_name) > 100:
-            task_name = task_name[:100]
-        
-        # Extract priority
-        priority = 3  # Default
-        if any(word in user_input.lower() for word in ['urgent', 'important', 'critical']):
-            priority = 1
-        elif any(word in user_input.lower() for word in ['high']):
-            priority = 2
-        elif any(word in user_input.lower() for word in ['low', 'sometime']):
-            priority = 4
-        
-        # Extract basic timing
-        deadline = None
-        if 'tomorrow' in user_input.lower():
-            deadline = timezone.now() + timedelta(days=1)
-        elif 'next week' in user_input.lower():
-            deadline = timezone.now() + timedelta(days=7)
-        elif 'today' in user_input.lower():
-            deadline = timezone.now() + timedelta(hours=8)
+        # The deadline is relative to now, so it is resolved outside the cache
+        deadline = timezone.now() + deadline_offset if deadline_offset is not None else None
         
         return {
             'name': task_name or 'New Task',
@@ -397,7 +860,8 @@ class JarvisTaskAgent:
         """Generate response for task creation"""
         task_name = task_data.get('name', 'your task')
         
-        if self.llm.available:
+        # Short requests have an unambiguous name; the template confirmation is enough
+        if self.llm.available and len(user_input.split()) > _SHORT_TASK_INPUT_WORDS:
             prompt = f"""You are Jarvis, a helpful AI assistant. The user said: "{user_input}"
 
 You are creating a task called: "{task_name}"
@@ -413,9 +877,13 @@ Response:"""
         # Fallback response
         return f"I'll create the task '{task_name}' for you!"
 
-    def _get_conversational_response(self, user_input: str) -> str:
+    def _get_conversational_response(self, user_input: str, user_lower: str = None) -> str:
         """Get conversational response - SIMPLIFIED"""
         
+        quick = _QUICK_REPLY_RE.match(user_input)
+        if quick:
+            return _QUICK_REPLIES[quick.lastgroup]
+        
         if self.llm.available:
             prompt = f"""You are Jarvis, a helpful AI assistant for task management.
 
@@ -425,103 +893,44 @@ Respond naturally in 1-2 sentences. Be helpful and friendly.
 
 Response:"""
             
-            ai_response = self.llm._call(prompt)
+            # Only two sentences are wanted, so stream and stop once they are complete
+            ai_response = self.llm._call_sentences(prompt, max_sentences=2)
             if ai_response and ai_response.strip():
                 return ai_response.strip()
         
         # Simple fallback responses
-        user_lower = user_input.lower()
+        if user_lower is None:
+            user_lower = user_input.lower()
         
         if any(word in user_lower for word in ['hello', 'hi', 'hey']):
-            return "Hello! I'm Jarvis, your task management assistant. How can I help you today?"
+            return _QUICK_REPLIES["greeting"]
         
         elif any(word in user_lower for word in ['thank', 'thanks']):
-            return "You're welcome! I'm always happy to help with your tasks."
+            return _QUICK_REPLIES["thanks"]
         
         elif any(word in user_lower for word in ['help', 'what can you do']):
-            return "I can help you create, manage, and organize your tasks. Just tell me what you need to do!"
+            return _QUICK_REPLIES["help"]
         
         else:
             return "I understand! I'm here to help you stay organized and productive."
 
-    def health_check(self) -> Dict[str, Any]:
-        """Check agent health - FIXED"""
-        try:
-            if self.llm.available:
-                # Test a simple generation
-                test_response = self.llm._call("Hello", stop=None)
-                
-                return {
-                    "status": "healthy",
-                    "ollama_url": self.ollama_url,
-                    "model": self.model,
-                    "test_response": test_response[:50] if test_response else "No response"
-                }
-            else:
-                return {
-                    "status": "unhealthy",
-                    "error": "Cannot connect to Ollama",
-                    "ollama_url": self.ollama_url,
-                    "model": self.model,
-                    "fallback_available": True
-                }
-                
-        except Exception as e:
-            return {
-                "status": "error",
-                "error": str(e),
-                "ollama_url": self.ollama_url,
-                "model": self.model,
-                "fallback_available": True
-            }
-    
     def process_conversation_context(self, conversation_history: List[str], new_input: str) -> Dict[str, Any]:
         """Process input with conversation context for better understanding"""
         
-        context_prompt = PromptTemplate(
-            template="""You are Jarvis, processing a conversation about task management with EDF/HPF scheduling focus.
-
-CONVERSATION HISTORY:
-{conversation_history}
-
-NEW USER INPUT: {new_input}
-CURRENT DATE/TIME: {current_datetime}
-
-Consider the conversation context when understanding the user's request. They might be:
-- Clarifying details about a previous request
-- Adding to or modifying something they mentioned before
-- Asking follow-up questions
-
-Focus on extracting scheduling-relevant information:
-- Duration in MINUTES
-- Priority and urgency for HPF algorithm
-- Deadlines for EDF algorithm
-- Scheduling constraints
-
-CRITICAL: Return ONLY valid JSON without any comments, explanations, or code block markers.
-
-{format_instructions}
-
-Return ONLY the JSON object:""",
-            input_variables=["conversation_history", "new_input", "current_datetime"],
-            partial_variables={"format_instructions": self.parser.get_format_instructions()}
-        )
-        
-        context_chain = LLMChain(llm=self.llm, prompt=context_prompt)
-        
         try:
-            current_datetime = timezone.now().strftime("%Y-%m-%d %H:%M:%S %Z")
+            current_datetime = timezone.now().strftime(_PROMPT_DATETIME_FORMAT)
             history_text = "\n".join([f"- {msg}" for msg in conversation_history])
             
-            response = context_chain.run(
+            prompt_text = _CONTEXT_PROMPT.format(
                 conversation_history=history_text,
                 new_input=new_input,
                 current_datetime=current_datetime
             )
+            response = self.llm._call(prompt_text, temperature=EXTRACTION_TEMPERATURE)
             
             # Clean and parse response
             cleaned_response = clean_json_response(response)
-            jarvis_response = self.parser.parse(cleaned_response)
+            jarvis_response = _parse_jarvis_response(cleaned_response)
             
             result = {
                 "success": True,
@@ -549,66 +958,15 @@ Return ONLY the JSON object:""",
     def generate_schedule_suggestions(self, tasks: List[Dict], user_preferences: Dict = None) -> Dict[str, Any]:
         """Generate intelligent schedule suggestions using EDF/HPF algorithms"""
         
-        schedule_prompt = PromptTemplate(
-            template="""You are Jarvis, an intelligent scheduling assistant using EDF (Earliest Deadline First) and HPF (Highest Priority First) algorithms.
-
-TASKS TO SCHEDULE:
-{tasks_json}
-
-USER PREFERENCES:
-{user_preferences}
-
-CURRENT DATE/TIME: {current_datetime}
-
-Apply EDF/HPF scheduling principles:
-
-EDF ALGORITHM:
-1. Sort tasks by deadline (earliest first)
-2. Consider deadline_flexibility_minutes for adjustments
-3. Prioritize overdue tasks first
-4. Account for task duration vs time until deadline
-
-HPF ALGORITHM:
-1. Sort tasks by calculated_priority (highest first)
-2. Use base_priority * urgency_multiplier * deadline_factor
-3. Consider category_weight from task categories
-4. Balance high priority with feasibility
-
-SCHEDULING CONSTRAINTS:
-- Respect can_be_split and requires_consecutive_time
-- Use estimated_duration_minutes for time allocation
-- Consider preferred_time_of_day and avoid_time_of_day
-- Account for required_energy_level and user's productive hours
-- Ensure minimum_duration_minutes and maximum_duration_minutes
-
-OPTIMIZATION GOALS:
-1. Minimize deadline violations (EDF priority)
-2. Maximize high-priority task completion (HPF priority)
-3. Optimize time block utilization
-4. Balance workload across time periods
-5. Respect user preferences and constraints
-
-Provide a detailed schedule with:
-- EDF/HPF algorithm application rationale
-- Specific time slots with justification
-- Conflict resolution strategies
-- Buffer time recommendations
-- Priority vs deadline trade-off explanations
-
-Output your schedule as a structured response with algorithm insights.""",
-            input_variables=["tasks_json", "user_preferences", "current_datetime"]
-        )
-        
-        schedule_chain = LLMChain(llm=self.llm, prompt=schedule_prompt)
-        
         try:
-            current_datetime = timezone.now().strftime("%Y-%m-%d %H:%M:%S %Z")
+            current_datetime = timezone.now().strftime(_PROMPT_DATETIME_FORMAT)
             
-            response = schedule_chain.run(
-                tasks_json=json.dumps(tasks, indent=2),
-                user_preferences=json.dumps(user_preferences or {}, indent=2),
+            prompt_text = _SCHEDULE_PROMPT.format(
+                tasks_table=_tasks_to_table(tasks),
+                user_preferences=_json_dumps_indented(user_preferences or {}),
                 current_datetime=current_datetime
             )
+            response = self.llm._call(prompt_text)
             
             return {
                 "success": True,
@@ -624,7 +982,10 @@ Output your schedule as a structured response with algorithm insights.""",
             }
     
     def health_check(self) -> Dict[str, Any]:
-        """Check if Ollama is running and accessible"""
+        """Check if Ollama is running and serving our model; a healthy result is reused for a short TTL"""
+        if self._last_health is not None and monotonic() - self._last_ok_ts < self._health_ttl:
+            return self._last_health
+        
         try:
             if not self.ollama_url:
                 return {
@@ -635,35 +996,45 @@ Output your schedule as a structured response with algorithm insights.""",
                 }
             
             # Test connection
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self.llm.session.get(f"{self.ollama_url}/api/tags", timeout=5)
             response.raise_for_status()
+            available_models = [m.get('name') for m in _json_loads(response.content).get('models', [])]
+            model = self.llm.model
             
-            # Test model availability
-            test_response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": "Hello",
-                    "stream": False
-                },
-                timeout=10
-            )
+            # A listed model is enough; only probe with a generation if it isn't listed
+            model_ok = model in available_models
+            if not model_ok:
+                test_response = self.llm.session.post(
+                    f"{self.ollama_url}/api/generate",
+                    data=_json_dumps({
+                        "model": model,
+                        "prompt": "Hello",
+                        "stream": False
+                    }),
+                    headers=_JSON_HEADERS,
+                    timeout=10
+                )
+                model_ok = test_response.status_code == 200
             
-            if test_response.status_code == 200:
-                return {
+            if model_ok:
+                result = {
                     "status": "healthy",
                     "ollama_url": self.ollama_url,
-                    "model": self.model,
-                    "available_models": self.available_models,
+                    "model": model,
+                    "available_models": available_models,
                     "optimization": "EDF/HPF Ready"
                 }
+                self._last_health = result
+                self._last_ok_ts = monotonic()
+                return result
             else:
                 return {
                     "status": "unhealthy",
-                    "error": f"Model {self.model} not available or not responding",
+                    "error": f"Model {model} not available or not responding",
                     "ollama_url": self.ollama_url,
-                    "model": self.model,
-                    "available_models": self.available_models
+                    "model": model,
+                    "available_models": available_models,
+                    "fallback_available": True
                 }
             
         except Exception as e:
@@ -671,23 +1042,80 @@ Output your schedule as a structured response with algorithm insights.""",
                 "status": "unhealthy",
                 "error": str(e),
                 "ollama_url": self.ollama_url or "unknown",
-                "model": self.model
+                "model": self.model,
+                "fallback_available": True
             }
 
-
 # ===================================
 # DJANGO INTEGRATION FUNCTIONS
 # ===================================
 
+# Rows per INSERT when the schedulers flush their decisions
+_BULK_CREATE_BATCH_SIZE = int(os.getenv("DEEPTALK_BULK_CREATE_BATCH_SIZE", "100"))
+
+# Decision scores are stored with four decimal places
+_SCORE_QUANTUM = Decimal('0.0001')
+
+
+def _to_score(value: float) -> Decimal:
+    """Float score as a Decimal, without the float -> str -> Decimal round trip"""
+    return Decimal.from_float(value).quantize(_SCORE_QUANTUM)
+
 def create_jarvis_agent(ollama_url: str = "http://localhost:11434", model: str = None) -> JarvisTaskAgent:
     """Create a Jarvis agent - FIXED"""
     return JarvisTaskAgent(ollama_url=ollama_url, model=model)
 
+@lru_cache(maxsize=1024)
+def _get_deeptalk_user_id(user_pk) -> Any:
+    """DeepTalkUser primary key for a Django user pk, created on first use"""
+    deeptalk_user, _ = DeepTalkUser.objects.get_or_create(
+        user_id=user_pk,
+        defaults={'timezone': 'UTC', 'subscription_tier': 'free'}
+    )
+    return deeptalk_user.pk
+
+
+@receiver(post_delete, sender=DeepTalkUser, dispatch_uid="deeptalk_user_id_cache_clear")
+def _clear_deeptalk_user_id_cache(sender, instance, **kwargs):
+    # Profiles are rarely deleted; dropping the whole cache keeps it simple
+    _get_deeptalk_user_id.cache_clear()
+
+
+def _create_user_task(user_pk, **fields) -> Task:
+    """Create a task for a Django user's DeepTalk profile.
+    
+    The cached profile id is per process, so a profile deleted by another worker
+    (or a rolled-back test transaction) leaves a stale id behind. The foreign key
+    then fails; the cache is dropped and the profile looked up again, once.
+    """
+    try:
+        with transaction.atomic():
+            return Task.objects.create(user_id=_get_deeptalk_user_id(user_pk), **fields)
+    except IntegrityError:
+        _get_deeptalk_user_id.cache_clear()
+        return Task.objects.create(user_id=_get_deeptalk_user_id(user_pk), **fields)
+
+
+# Reachable agents keyed by (ollama_url, model), shared across requests so the
+# HTTP session and response cache survive between chat turns
+_shared_agents: Dict[Tuple[Optional[str], Optional[str]], JarvisTaskAgent] = {}
+
+def _get_default_agent(ollama_url: str = None, model: str = None) -> JarvisTaskAgent:
+    """Shared agent for (ollama_url, model); unreachable ones are rebuilt on the next call"""
+    key = (ollama_url, model)
+    agent = _shared_agents.get(key)
+    if agent is None or not agent.llm.available:
+        agent = JarvisTaskAgent(ollama_url=ollama_url, model=model)
+        if agent.llm.available:
+            agent = _shared_agents.setdefault(key, agent)
+    return agent
+
+
 def process_task_with_jarvis(user_input: str, user=None, agent: JarvisTaskAgent = None) -> Dict[str, Any]:
     """Process user input and create tasks - FIXED"""
     
     if not agent:
-        agent = create_jarvis_agent()
+        agent = _get_default_agent()
     
     # Process the input
     result = agent.process_user_input(user_input, user)
@@ -698,17 +1126,11 @@ def process_task_with_jarvis(user_input: str, user=None, agent: JarvisTaskAgent
     # If should create task and user is authenticated, create in database
     if user and result.get("should_create_task") and result.get("task"):
         try:
-            # Get or create DeepTalk user
-            deeptalk_user, created = DeepTalkUser.objects.get_or_create(
-                user=user,
-                defaults={'timezone': 'UTC', 'subscription_tier': 'free'}
-            )
-            
             task_data = result["task"]
             
-            # Create task
-            task = Task.objects.create(
-                user=deeptalk_user,
+            # Create task; warm users skip the profile lookup
+            task = _create_user_task(
+                user.pk,
                 name=task_data["name"],
                 description=task_data.get("description", ""),
                 priority=task_data.get("priority", 3),
@@ -729,12 +1151,14 @@ def process_task_with_jarvis(user_input: str, user=None, agent: JarvisTaskAgent
     
     return result
 
+# Fallback task keywords, matched as substrings ("tasks", "reminder" count too)
+_SIMPLE_TASK_KEYWORDS_RE = re.compile(r"task|todo|remind|schedule|need to|have to", re.IGNORECASE)
+
 def simple_task_processing(user_input, deeptalk_user):
     """Simple fallback task processing when AI is not available"""
     
     # Simple keyword detection
-    task_keywords = ['task', 'todo', 'remind', 'schedule', 'need to', 'have to']
-    should_create = any(keyword in user_input.lower() for keyword in task_keywords)
+    should_create = _SIMPLE_TASK_KEYWORDS_RE.search(user_input) is not None
     
     if should_create and deeptalk_user:
         # Create a simple task
@@ -766,182 +1190,301 @@ def simple_task_processing(user_input, deeptalk_user):
     }
 
 def create_time_blocks_from_preferences(user: DeepTalkUser) -> List[TimeBlock]:
-    """Create default time blocks based on user preferences"""
-    
-    try:
-        preferences = user.preferences
-    except UserPreferences.DoesNotExist:
-        # Create default preferences if none exist
-        preferences = UserPreferences.objects.create(user=user)
+    """Create and persist default time blocks based on user preferences"""
     
     time_blocks = []
     
     # Create time blocks for the next 7 days
     start_date = timezone.now().date()
-    for i in range(7):
-        current_date = start_date + timedelta(days=i)
-        
-        # Skip weekends if not in preferred work days
-        if preferences.preferred_work_days and current_date.weekday() not in preferences.preferred_work_days:
-            continue
-        
-        # Create work time block
-        work_start = timezone.make_aware(
-            datetime.combine(current_date, preferences.work_start_time)
-        )
-        work_end = timezone.make_aware(
-            datetime.combine(current_date, preferences.work_end_time)
-        )
-        
-        # Create morning block (work start to lunch)
-        lunch_start = work_start + timedelta(hours=4)  # Assume lunch after 4 hours
-        morning_block = TimeBlock(
-            user=user,
-            start_time=work_start,
-            end_time=lunch_start,
-            block_type='available',
-            status='available',
-            can_be_split=True,
-            min_task_duration_minutes=15,
-            max_task_duration_minutes=240,  # 4 hours max
-            flexibility_score=Decimal('1.0'),
-            importance_weight=Decimal('1.0')
-        )
-        time_blocks.append(morning_block)
-        
-        # Create lunch break
-        lunch_end = lunch_start + timedelta(minutes=preferences.lunch_break_duration)
-        lunch_block = TimeBlock(
-            user=user,
-            start_time=lunch_start,
-            end_time=lunch_end,
-            block_type='break',
-            status='occupied',
-            can_be_split=False,
-            flexibility_score=Decimal('0.3')  # Low flexibility for lunch
-        )
-        time_blocks.append(lunch_block)
-        
-        # Create afternoon block (lunch end to work end)
-        afternoon_block = TimeBlock(
-            user=user,
-            start_time=lunch_end,
-            end_time=work_end,
-            block_type='available',
-            status='available',
-            can_be_split=True,
-            min_task_duration_minutes=15,
-            max_task_duration_minutes=240,
-            flexibility_score=Decimal('1.0'),
-            importance_weight=Decimal('1.0')
-        )
-        time_blocks.append(afternoon_block)
+    
+    with transaction.atomic():
+        # Create default preferences if none exist
+        preferences, _ = UserPreferences.objects.get_or_create(user=user)
+        work_days = preferences.preferred_work_days
+        work_start_time = preferences.work_start_time
+        work_end_time = preferences.work_end_time
+        lunch_duration = timedelta(minutes=preferences.lunch_break_duration)
+        # Same result as make_aware() for zoneinfo zones, resolved once
+        tz = timezone.get_current_timezone()
+        
+        for i in range(7):
+            current_date = start_date + i * _ONE_DAY
+            
+            # Skip weekends if not in preferred work days
+            if work_days and current_date.weekday() not in work_days:
+                continue
+            
+            # Create work time block
+            work_start = datetime.combine(current_date, work_start_time, tzinfo=tz)
+            work_end = datetime.combine(current_date, work_end_time, tzinfo=tz)
+            
+            # Create morning block (work start to lunch)
+            lunch_start = work_start + _LUNCH_AFTER  # Assume lunch after 4 hours
+            morning_block = TimeBlock(
+                user=user,
+                start_time=work_start,
+                end_time=lunch_start,
+                block_type='available',
+                status='available',
+                can_be_split=True,
+                min_task_duration_minutes=15,
+                max_task_duration_minutes=240,  # 4 hours max
+                flexibility_score=Decimal('1.0'),
+                importance_weight=Decimal('1.0')
+            )
+            time_blocks.append(morning_block)
+            
+            # Create lunch break
+            lunch_end = lunch_start + lunch_duration
+            lunch_block = TimeBlock(
+                user=user,
+                start_time=lunch_start,
+                end_time=lunch_end,
+                block_type='break',
+                status='occupied',
+                can_be_split=False,
+                flexibility_score=Decimal('0.3')  # Low flexibility for lunch
+            )
+            time_blocks.append(lunch_block)
+            
+            # Create afternoon block (lunch end to work end)
+            afternoon_block = TimeBlock(
+                user=user,
+                start_time=lunch_end,
+                end_time=work_end,
+                block_type='available',
+                status='available',
+                can_be_split=True,
+                min_task_duration_minutes=15,
+                max_task_duration_minutes=240,
+                flexibility_score=Decimal('1.0'),
+                importance_weight=Decimal('1.0')
+            )
+            time_blocks.append(afternoon_block)
+            
+        # One multi-row INSERT instead of a save() per block
+        time_blocks = TimeBlock.objects.bulk_create(time_blocks, batch_size=_BULK_CREATE_BATCH_SIZE)
     
     return time_blocks
 
 
+class _FitTree:
+    """Max segment tree over block durations, kept in block start order.
+
+    first_fit() returns the earliest block with enough room in O(log M);
+    consumed blocks are set to -1 so they never match again.
+    """
+    __slots__ = ("_size", "_max")
+
+    def __init__(self, durations: List[float]):
+        size = 1
+        while size < len(durations):
+            size <<= 1
+        tree = [-1] * (2 * size)
+        tree[size:size + len(durations)] = durations
+        for i in range(size - 1, 0, -1):
+            tree[i] = max(tree[2 * i], tree[2 * i + 1])
+        self._size = size
+        self._max = tree
+
+    def update(self, index: int, duration: float) -> None:
+        tree = self._max
+        i = index + self._size
+        tree[i] = duration
+        i >>= 1
+        while i:
+            tree[i] = max(tree[2 * i], tree[2 * i + 1])
+            i >>= 1
+
+    def first_fit(self, need: float, lo: int = 0) -> int:
+        """Index of the first block at or after lo with at least need minutes, or -1"""
+        tree, size = self._max, self._size
+        if lo >= size or tree[1] < need:
+            return -1
+        i = lo + size
+        # Walk right along the frontier until a subtree has room, then descend into it
+        while tree[i] < need:
+            while i & 1:
+                i >>= 1
+            if not i:
+                return -1
+            i += 1
+        while i < size:
+            i <<= 1
+            if tree[i] < need:
+                i += 1
+        return i - size
+
+
+# Columns the schedulers read; calculated_priority needs the first three plus category
+SCHEDULER_TASK_FIELDS = (
+    'id', 'name', 'base_priority', 'urgency_multiplier', 'deadline', 'category',
+    'estimated_duration_minutes', 'can_be_split',
+)
+SCHEDULER_BLOCK_FIELDS = (
+    'id', 'start_time', 'end_time', 'status', 'can_be_split',
+    'min_task_duration_minutes', 'max_task_duration_minutes', 'importance_weight',
+)
+
+
+def _scan_time_blocks(time_blocks: List[TimeBlock]) -> Tuple[Any, Any, List[TimeBlock]]:
+    """Scheduling window bounds and available blocks, in a single pass"""
+    window_start = window_end = None
+    available = []
+    for block in time_blocks:
+        if window_start is None or block.start_time < window_start:
+            window_start = block.start_time
+        if window_end is None or block.end_time > window_end:
+            window_end = block.end_time
+        if block.status == 'available':
+            available.append(block)
+    return window_start, window_end, available
+
+
 def run_edf_scheduling(user: DeepTalkUser, tasks: List[Task], time_blocks: List[TimeBlock]) -> Dict[str, Any]:
-    """Run Earliest Deadline First scheduling algorithm"""
+    """Run Earliest Deadline First scheduling algorithm
+    
+    Only a few columns are read, so callers can load rows lean, e.g.
+    Task.objects.select_related('category').only(*SCHEDULER_TASK_FIELDS) and
+    TimeBlock.objects.only(*SCHEDULER_BLOCK_FIELDS).
+    """
     from .models import SchedulingRun, ScheduleDecision
     import time as time_module
     
     start_time = time_module.time()
+    # Evaluate lazy querysets once; everything below indexes into these lists
+    tasks = list(tasks)
+    time_blocks = list(time_blocks)
+    
+    # Nothing to place: skip the scheduling run record entirely
+    if not tasks or not time_blocks:
+        return {
+            "success": True,
+            "algorithm": "EDF",
+            "scheduling_run_id": None,
+            "tasks_scheduled": 0,
+            "tasks_unscheduled": len(tasks),
+            "execution_time_ms": 0,
+            "deadline_violations": 0,
+            "efficiency_score": 0.0,
+            "decisions": []
+        }
     
-    # Create scheduling run record
-    scheduling_run = SchedulingRun.objects.create(
+    window_start, window_end, available = _scan_time_blocks(time_blocks)
+    
+    # Scheduling run record, inserted together with its decisions
+    scheduling_run = SchedulingRun(
         user=user,
         algorithm_used='EDF',
         algorithm_version='1.0',
-        scheduling_window_start=min(block.start_time for block in time_blocks),
-        scheduling_window_end=max(block.end_time for block in time_blocks),
+        scheduling_window_start=window_start,
+        scheduling_window_end=window_end,
         tasks_considered=len(tasks),
-        time_blocks_available=len([b for b in time_blocks if b.status == 'available']),
+        time_blocks_available=len(available),
         status='running'
     )
     
     try:
-        # Sort tasks by deadline (EDF algorithm)
-        tasks_with_deadline = [t for t in tasks if t.deadline]
-        tasks_without_deadline = [t for t in tasks if not t.deadline]
-        
-        # EDF: Sort by deadline first, then by priority
-        sorted_tasks = sorted(
-            tasks_with_deadline, 
-            key=lambda t: (t.deadline, -t.calculated_priority)
-        ) + sorted(
-            tasks_without_deadline,
-            key=lambda t: -t.calculated_priority
-        )
+        # Read task properties once; calculated_priority hits the clock and category
+        priorities = [t.calculated_priority for t in tasks]
+        durations = [t.estimated_duration_minutes for t in tasks]
+        deadlines = [t.deadline for t in tasks]
+        
+        # EDF: Sort by deadline first, then by priority. Both sorts are stable, so
+        # a priority pass followed by a deadline pass gives that order.
+        by_priority = sorted(range(len(tasks)), key=priorities.__getitem__, reverse=True)
+        order = sorted(
+            (i for i in by_priority if deadlines[i]),
+            key=deadlines.__getitem__
+        ) + [i for i in by_priority if not deadlines[i]]
         
         # Available time blocks sorted by start time
-        available_blocks = sorted(
-            [b for b in time_blocks if b.status == 'available'],
-            key=lambda b: b.start_time
-        )
+        available_blocks = sorted(available, key=lambda b: b.start_time)
+        block_durs = [b.duration_minutes for b in available_blocks]
+        block_min = [b.min_task_duration_minutes for b in available_blocks]
+        block_max = [b.max_task_duration_minutes for b in available_blocks]
         
         scheduled_tasks = 0
         unscheduled_tasks = 0
         decisions = []
+        decision_rows = []  # Response entries, built alongside the model instances
+        fit_tree = _FitTree(block_durs)
         
         # Schedule each task
-        for task in sorted_tasks:
-            scheduled = False
+        for i in order:
+            task = tasks[i]
+            need = durations[i]
             
-            # Find suitable time block
-            for block in available_blocks:
-                # Check if task fits in this block
-                if (block.duration_minutes >= task.estimated_duration_minutes and
-                    (not block.min_task_duration_minutes or task.estimated_duration_minutes >= block.min_task_duration_minutes) and
-                    (not block.max_task_duration_minutes or task.estimated_duration_minutes <= block.max_task_duration_minutes)):
-                    
-                    # Calculate scheduling scores
-                    deadline_urgency = 0.0
-                    if task.deadline:
-                        time_until_deadline = (task.deadline - block.start_time).total_seconds() / 3600  # hours
-                        deadline_urgency = max(0, 100 - time_until_deadline)  # Higher score for closer deadlines
-                    
-                    # Create schedule decision
-                    decision = ScheduleDecision.objects.create(
-                        scheduling_run=scheduling_run,
-                        task=task,
-                        time_block=block,
-                        scheduled_start_time=block.start_time,
-                        scheduled_end_time=block.start_time + timedelta(minutes=task.estimated_duration_minutes),
-                        decision_reason=f"EDF: Task deadline {task.deadline}, fits in block {block.start_time}",
-                        priority_score=Decimal(str(task.calculated_priority)),
-                        deadline_urgency_score=Decimal(str(deadline_urgency)),
-                        efficiency_score=Decimal(str(task.estimated_duration_minutes / block.duration_minutes * 100)),
-                        is_optimal=True,
-                        confidence_level=Decimal('0.8')
-                    )
-                    decisions.append(decision)
-                    
-                    # Update block availability
-                    if task.estimated_duration_minutes >= block.duration_minutes:
-                        # Task takes entire block
-                        block.status = 'occupied'
-                        available_blocks.remove(block)
-                    else:
-                        # Split block if task allows it and block allows it
-                        if task.can_be_split and block.can_be_split:
-                            # Create remaining block
-                            remaining_start = block.start_time + timedelta(minutes=task.estimated_duration_minutes)
-                            if remaining_start < block.end_time:
-                                # Update original block end time
-                                block.end_time = remaining_start
-                                # Note: In real implementation, you'd create a new TimeBlock for the remainder
-                    
-                    scheduled_tasks += 1
-                    scheduled = True
+            # Find the earliest block with room that also accepts this task length
+            index = fit_tree.first_fit(need)
+            while index >= 0:
+                if ((not block_min[index] or need >= block_min[index]) and
+                    (not block_max[index] or need <= block_max[index])):
                     break
+                index = fit_tree.first_fit(need, index + 1)
             
-            if not scheduled:
+            if index < 0:
                 unscheduled_tasks += 1
+                continue
+            block = available_blocks[index]
+            
+            # Calculate scheduling scores
+            deadline_urgency = 0.0
+            if deadlines[i]:
+                time_until_deadline = (deadlines[i] - block.start_time).total_seconds() / 3600  # hours
+                deadline_urgency = max(0, 100 - time_until_deadline)  # Higher score for closer deadlines
+            
+            # Create schedule decision
+            scheduled_start = block.start_time
+            scheduled_end = scheduled_start + timedelta(minutes=need)
+            decision = ScheduleDecision(
+                scheduling_run=scheduling_run,
+                task=task,
+                time_block=block,
+                scheduled_start_time=scheduled_start,
+                scheduled_end_time=scheduled_end,
+                decision_reason=f"EDF: Task deadline {deadlines[i]}, fits in block {scheduled_start}",
+                priority_score=_to_score(priorities[i]),
+                deadline_urgency_score=_to_score(deadline_urgency),
+                efficiency_score=_to_score(need / block_durs[index] * 100),
+                is_optimal=True,
+                confidence_level=Decimal('0.8')
+            )
+            decisions.append(decision)
+            decision_rows.append({
+                "decision_id": str(decision.id),
+                "task_id": str(task.id),
+                "task_name": task.name,
+                "scheduled_start": scheduled_start.isoformat(),
+                "scheduled_end": scheduled_end.isoformat(),
+                "priority_score": float(priorities[i]),
+                "deadline_urgency": float(deadline_urgency)
+            })
+            
+            # Update block availability
+            if need >= block_durs[index]:
+                # Task takes entire block
+                block.status = 'occupied'
+                fit_tree.update(index, -1)
+            else:
+                # Split block if task allows it and block allows it
+                if task.can_be_split and block.can_be_split:
+                    # Create remaining block
+                    remaining_start = block.start_time + timedelta(minutes=need)
+                    if remaining_start < block.end_time:
+                        # Update original block end time
+                        block.end_time = remaining_start
+                        block_durs[index] = block.duration_minutes
+                        fit_tree.update(index, block_durs[index])
+                        # Note: In real implementation, you'd create a new TimeBlock for the remainder
+            
+            scheduled_tasks += 1
         
         # Calculate performance metrics
         execution_time = int((time_module.time() - start_time) * 1000)  # milliseconds
-        deadline_violations = sum(1 for task in sorted_tasks 
-                                if task.deadline and task.deadline < timezone.now())
+        now = timezone.now()
+        deadline_violations = sum(1 for deadline in deadlines
+                                if deadline and deadline < now)
         
         # Update scheduling run with results
         scheduling_run.tasks_scheduled = scheduled_tasks
@@ -951,7 +1494,11 @@ def run_edf_scheduling(user: DeepTalkUser, tasks: List[Task], time_blocks: List[
         scheduling_run.schedule_efficiency_score = Decimal(str(scheduled_tasks / len(tasks) * 100)) if tasks else Decimal('0')
         scheduling_run.deadline_compliance_rate = Decimal(str((len(tasks) - deadline_violations) / len(tasks) * 100)) if tasks else Decimal('100')
         scheduling_run.status = 'completed'
-        scheduling_run.save()
+        
+        # Persist the run and all its decisions in one transaction
+        with transaction.atomic():
+            scheduling_run.save()
+            ScheduleDecision.objects.bulk_create(decisions, batch_size=_BULK_CREATE_BATCH_SIZE)
         
         return {
             "success": True,
@@ -962,16 +1509,7 @@ def run_edf_scheduling(user: DeepTalkUser, tasks: List[Task], time_blocks: List[
             "execution_time_ms": execution_time,
             "deadline_violations": deadline_violations,
             "efficiency_score": float(scheduling_run.schedule_efficiency_score),
-            "decisions": [
-                {
-                    "task_id": str(d.task.id),
-                    "task_name": d.task.name,
-                    "scheduled_start": d.scheduled_start_time.isoformat() if d.scheduled_start_time else None,
-                    "scheduled_end": d.scheduled_end_time.isoformat() if d.scheduled_end_time else None,
-                    "priority_score": float(d.priority_score),
-                    "deadline_urgency": float(d.deadline_urgency_score)
-                } for d in decisions
-            ]
+            "decisions": decision_rows
         }
         
     except Exception as e:
@@ -987,95 +1525,148 @@ def run_edf_scheduling(user: DeepTalkUser, tasks: List[Task], time_blocks: List[
 
 
 def run_hpf_scheduling(user: DeepTalkUser, tasks: List[Task], time_blocks: List[TimeBlock]) -> Dict[str, Any]:
-    """Run Highest Priority First scheduling algorithm"""
+    """Run Highest Priority First scheduling algorithm
+    
+    Only a few columns are read, so callers can load rows lean, e.g.
+    Task.objects.select_related('category').only(*SCHEDULER_TASK_FIELDS) and
+    TimeBlock.objects.only(*SCHEDULER_BLOCK_FIELDS).
+    """
     from .models import SchedulingRun, ScheduleDecision
     import time as time_module
     
     start_time = time_module.time()
+    # Evaluate lazy querysets once; everything below indexes into these lists
+    tasks = list(tasks)
+    time_blocks = list(time_blocks)
+    
+    # Nothing to place: skip the scheduling run record entirely
+    if not tasks or not time_blocks:
+        return {
+            "success": True,
+            "algorithm": "HPF",
+            "scheduling_run_id": None,
+            "tasks_scheduled": 0,
+            "tasks_unscheduled": len(tasks),
+            "execution_time_ms": 0,
+            "average_priority_score": 0,
+            "efficiency_score": 0.0,
+            "decisions": []
+        }
     
-    # Create scheduling run record
-    scheduling_run = SchedulingRun.objects.create(
+    window_start, window_end, available = _scan_time_blocks(time_blocks)
+    
+    # Scheduling run record, inserted together with its decisions
+    scheduling_run = SchedulingRun(
         user=user,
         algorithm_used='HPF',
         algorithm_version='1.0',
-        scheduling_window_start=min(block.start_time for block in time_blocks),
-        scheduling_window_end=max(block.end_time for block in time_blocks),
+        scheduling_window_start=window_start,
+        scheduling_window_end=window_end,
         tasks_considered=len(tasks),
-        time_blocks_available=len([b for b in time_blocks if b.status == 'available']),
+        time_blocks_available=len(available),
         status='running'
     )
     
     try:
+        # Read task properties once; calculated_priority hits the clock and category
+        priorities = [float(t.calculated_priority) for t in tasks]
+        durations = [t.estimated_duration_minutes for t in tasks]
+        
         # Sort tasks by calculated priority (HPF algorithm)
-        sorted_tasks = sorted(tasks, key=lambda t: -t.calculated_priority)  # Highest priority first
+        order = sorted(range(len(tasks)), key=priorities.__getitem__, reverse=True)  # Highest priority first
         
         # Available time blocks sorted by start time
-        available_blocks = sorted(
-            [b for b in time_blocks if b.status == 'available'],
-            key=lambda b: b.start_time
-        )
+        available_blocks = sorted(available, key=lambda b: b.start_time)
+        block_durs = [b.duration_minutes for b in available_blocks]
+        block_min = [b.min_task_duration_minutes for b in available_blocks]
+        block_max = [b.max_task_duration_minutes for b in available_blocks]
+        weighted_imp = [float(b.importance_weight) * 0.1 for b in available_blocks]  # Block importance
         
         scheduled_tasks = 0
         unscheduled_tasks = 0
         decisions = []
+        decision_rows = []  # Response entries, built alongside the model instances
         total_priority_score = 0
         
+        # Block positions ordered by duration, with a parallel key list for bisect
+        by_duration = sorted(range(len(available_blocks)), key=block_durs.__getitem__)
+        fit_keys = [block_durs[index] for index in by_duration]
+        max_weighted_imp = max(weighted_imp, default=0.0)
+        timing_score = 1.0  # Could be enhanced with preferred times
+        weighted_timing = timing_score * 0.2  # Timing weight
+        
         # Schedule each task
-        for task in sorted_tasks:
-            scheduled = False
+        for i in order:
+            task = tasks[i]
+            need = durations[i]
+            priority = priorities[i]
+            weighted_priority = priority * 0.4  # Priority weight
             best_block = None
+            best_index = -1
+            best_pos = -1
             best_score = -1
             
-            # Find best suitable time block
-            for block in available_blocks:
-                # Check if task fits in this block
-                if (block.duration_minutes >= task.estimated_duration_minutes and
-                    (not block.min_task_duration_minutes or task.estimated_duration_minutes >= block.min_task_duration_minutes) and
-                    (not block.max_task_duration_minutes or task.estimated_duration_minutes <= block.max_task_duration_minutes)):
-                    
-                    # Calculate block suitability score
-                    efficiency = task.estimated_duration_minutes / block.duration_minutes
-                    timing_score = 1.0  # Could be enhanced with preferred times
-                    
-                    # Combine scores
-                    block_score = (
-                        float(task.calculated_priority) * 0.4 +  # Priority weight
-                        efficiency * 0.3 +  # Efficiency weight
-                        timing_score * 0.2 +  # Timing weight
-                        float(block.importance_weight) * 0.1  # Block importance
-                    )
-                    
-                    if block_score > best_score:
-                        best_score = block_score
-                        best_block = block
-            
-            if best_block:
-                # Schedule task in best block
-                decision = ScheduleDecision.objects.create(
-                    scheduling_run=scheduling_run,
-                    task=task,
-                    time_block=best_block,
-                    scheduled_start_time=best_block.start_time,
-                    scheduled_end_time=best_block.start_time + timedelta(minutes=task.estimated_duration_minutes),
-                    decision_reason=f"HPF: Highest priority task ({task.calculated_priority}) scheduled in optimal block",
-                    priority_score=Decimal(str(task.calculated_priority)),
-                    efficiency_score=Decimal(str(best_score)),
-                    is_optimal=True,
-                    confidence_level=Decimal('0.85')
-                )
-                decisions.append(decision)
+            # Walk fitting blocks from the smallest up. Efficiency only falls as
+            # blocks grow, so stop once even the most important block cannot win.
+            for pos in range(bisect.bisect_left(fit_keys, need), len(fit_keys)):
+                efficiency = need / fit_keys[pos]
+                # Score minus the block importance term; same summation order as before
+                partial = weighted_priority + efficiency * 0.3 + weighted_timing  # Efficiency weight
+                if partial + max_weighted_imp < best_score:
+                    break
+                
+                index = by_duration[pos]
+                if not ((not block_min[index] or need >= block_min[index]) and
+                        (not block_max[index] or need <= block_max[index])):
+                    continue
                 
-                # Update block availability
-                if task.estimated_duration_minutes >= best_block.duration_minutes:
-                    best_block.status = 'occupied'
-                    available_blocks.remove(best_block)
+                block_score = partial + weighted_imp[index]
                 
-                scheduled_tasks += 1
-                total_priority_score += task.calculated_priority
-                scheduled = True
+                # Ties go to the earlier block, as in a start-ordered scan
+                if block_score > best_score or (block_score == best_score and index < best_index):
+                    best_score = block_score
+                    best_block = available_blocks[index]
+                    best_index = index
+                    best_pos = pos
             
-            if not scheduled:
+            if best_block is None:
                 unscheduled_tasks += 1
+                continue
+            
+            # Schedule task in best block
+            scheduled_start = best_block.start_time
+            scheduled_end = scheduled_start + timedelta(minutes=need)
+            decision = ScheduleDecision(
+                scheduling_run=scheduling_run,
+                task=task,
+                time_block=best_block,
+                scheduled_start_time=scheduled_start,
+                scheduled_end_time=scheduled_end,
+                decision_reason=f"HPF: Highest priority task ({priority}) scheduled in optimal block",
+                priority_score=_to_score(priority),
+                efficiency_score=_to_score(best_score),
+                is_optimal=True,
+                confidence_level=Decimal('0.85')
+            )
+            decisions.append(decision)
+            decision_rows.append({
+                "decision_id": str(decision.id),
+                "task_id": str(task.id),
+                "task_name": task.name,
+                "scheduled_start": scheduled_start.isoformat(),
+                "scheduled_end": scheduled_end.isoformat(),
+                "priority_score": priority,
+                "efficiency_score": best_score
+            })
+            
+            # Update block availability
+            if need >= block_durs[best_index]:
+                best_block.status = 'occupied'
+                del by_duration[best_pos]
+                del fit_keys[best_pos]
+            
+            scheduled_tasks += 1
+            total_priority_score += priority
         
         # Calculate performance metrics
         execution_time = int((time_module.time() - start_time) * 1000)  # milliseconds
@@ -1088,7 +1679,11 @@ def run_hpf_scheduling(user: DeepTalkUser, tasks: List[Task], time_blocks: List[
         scheduling_run.average_priority_score = Decimal(str(average_priority))
         scheduling_run.schedule_efficiency_score = Decimal(str(scheduled_tasks / len(tasks) * 100)) if tasks else Decimal('0')
         scheduling_run.status = 'completed'
-        scheduling_run.save()
+        
+        # Persist the run and all its decisions in one transaction
+        with transaction.atomic():
+            scheduling_run.save()
+            ScheduleDecision.objects.bulk_create(decisions, batch_size=_BULK_CREATE_BATCH_SIZE)
         
         return {
             "success": True,
@@ -1099,16 +1694,7 @@ def run_hpf_scheduling(user: DeepTalkUser, tasks: List[Task], time_blocks: List[
             "execution_time_ms": execution_time,
             "average_priority_score": average_priority,
             "efficiency_score": float(scheduling_run.schedule_efficiency_score),
-            "decisions": [
-                {
-                    "task_id": str(d.task.id),
-                    "task_name": d.task.name,
-                    "scheduled_start": d.scheduled_start_time.isoformat() if d.scheduled_start_time else None,
-                    "scheduled_end": d.scheduled_end_time.isoformat() if d.scheduled_end_time else None,
-                    "priority_score": float(d.priority_score),
-                    "efficiency_score": float(d.efficiency_score)
-                } for d in decisions
-            ]
+            "decisions": decision_rows
         }
         
     except Exception as e:
@@ -2,10 +2,128 @@
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from django.utils import timezone
+from django.db import DatabaseError
 from django.db.models import Avg, Count, Q
 from collections import defaultdict, Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+import bisect
+import heapq
 import json
-import numpy as np
+import logging
+import math
+import statistics
+
+logger = logging.getLogger(__name__)
+
+
+# Task columns read by the pattern analysis helpers
+PATTERN_TASK_FIELDS = (
+    'id', 'category__name', 'specific_time', 'estimated_duration_minutes',
+    'actual_time_spent_minutes', 'status', 'completed_at', 'deadline',
+    'created_at', 'user_satisfaction_rating', 'base_priority', 'priority',
+)
+
+@lru_cache(maxsize=None)
+def _priority_getter(model) -> attrgetter:
+    """Priority accessor for a Task model: base_priority, or the legacy priority field"""
+    return attrgetter('base_priority' if hasattr(model, 'base_priority') else 'priority')
+
+
+# Bucket bounds (bisect_right over the upper-exclusive bounds) and their labels
+DURATION_ACCURACY_LABELS = ('overestimate', 'accurate', 'underestimate')
+PROCRASTINATION_HOUR_BOUNDS = (6, 24, 72)
+PROCRASTINATION_LABELS = ('last_minute', 'day_of', 'few_days_early', 'well_planned')
+PLANNING_HOUR_BOUNDS = (2, 24, 72)
+PLANNING_STYLE_LABELS = ('last_minute', 'same_day', 'few_days_ahead', 'long_term_planner')
+DURATION_RANGE_BOUNDS = (30, 90)  # minutes
+DURATION_RANGE_LABELS = ('short_tasks', 'medium_tasks', 'long_tasks')
+
+
+# Snapshots are also refreshed after this long, since the analysis window slides
+PATTERN_SNAPSHOT_MAX_AGE = timedelta(days=1)
+
+# Pattern dicts keyed by hour or priority; JSON storage turns their int keys into strings
+_INT_KEYED_PATTERNS = (
+    ('productivity_hours', 'productivity_by_hour'),
+    ('priority_patterns', 'priority_distribution'),
+    ('priority_patterns', 'completion_by_priority'),
+)
+
+
+def _restore_int_keys(patterns: Dict[str, Any]) -> Dict[str, Any]:
+    """Give a stored snapshot the int hour and priority keys of a fresh analysis"""
+    for section, name in _INT_KEYED_PATTERNS:
+        values = patterns.get(section, {}).get(name)
+        if values:
+            patterns[section][name] = {
+                int(key) if isinstance(key, str) and key.lstrip('-').isdigit() else key: value
+                for key, value in values.items()
+            }
+    return patterns
+
+
+# The pattern lists are short (a handful to a few hundred values), where
+# plain Python beats building a NumPy array per statistic
+def _mean(values) -> float:
+    return sum(values) / len(values)
+
+
+@dataclass(slots=True)
+class _HourStats:
+    """Running count, sums and histogram of scheduled hours.
+
+    Hours are small ints, so the sums stay exact and mean/std come out of
+    them directly, without keeping the hours or making a second pass.
+    """
+    n: int = 0
+    total: int = 0
+    total_sq: int = 0
+    counts: Counter = field(default_factory=Counter)
+
+    def add(self, hour: int) -> None:
+        self.n += 1
+        self.total += hour
+        self.total_sq += hour * hour
+        self.counts[hour] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation"""
+        return math.sqrt(self.n * self.total_sq - self.total * self.total) / self.n
+
+
+@dataclass(slots=True)
+class _TaskPatternData:
+    """Raw aggregates gathered from the task history in one pass"""
+    # category -> scheduled hour stats (tasks with a specific_time)
+    time_preferences: Dict[str, _HourStats] = field(default_factory=lambda: defaultdict(_HourStats))
+    # actual / estimated duration ratios; per category only the sum and count are needed
+    duration_ratios: List[float] = field(default_factory=list)
+    category_ratio_sums: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    category_ratio_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # Category affinity as parallel per-category counters
+    category_totals: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    category_completed: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    satisfaction_sums: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    satisfaction_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    # completed tasks by weekday name / hour, and hours left before the deadline
+    completion_by_day: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    completion_by_hour: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    hours_before_deadline_total: float = 0.0
+    deadline_completions: int = 0
+    created_by_hour: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    advance_planning: List[float] = field(default_factory=list)
+    preferred_durations: List[int] = field(default_factory=list)
+    priority_usage: Counter = field(default_factory=Counter)
+    priority_completion: Dict[Any, Dict[str, int]] = field(
+        default_factory=lambda: defaultdict(lambda: {'total': 0, 'completed': 0})
+    )
 
 
 class PersonalizationEngine:
@@ -24,43 +142,109 @@ class PersonalizationEngine:
         """Analyze user's historical patterns and preferences"""
         from .models import Task, TaskLog
         
-        # Get user's task history
-        tasks = Task.objects.filter(
+        # Get user's task history, with categories joined in so the helpers
+        # reading task.category.name don't issue one query per task. Evaluated
+        # once; the helpers filter this list in Python instead of re-querying.
+        tasks = list(Task.objects.filter(
             user=user, 
             deleted_at__isnull=True,
             created_at__gte=timezone.now() - timedelta(days=90)  # Last 90 days
-        )
+        ).select_related('category').only(*PATTERN_TASK_FIELDS))
+        
+        raw = self._collect_raw(tasks)
         
         patterns = {
-            'preferred_times': self._analyze_time_preferences(tasks),
-            'duration_accuracy': self._analyze_duration_accuracy(tasks),
-            'category_preferences': self._analyze_category_affinity(tasks),
-            'completion_patterns': self._analyze_completion_patterns(tasks),
-            'productivity_hours': self._analyze_productivity_patterns(tasks),
-            'scheduling_habits': self._analyze_scheduling_habits(tasks),
-            'priority_patterns': self._analyze_priority_patterns(tasks)
+            'preferred_times': self._analyze_time_preferences(raw),
+            'duration_accuracy': self._analyze_duration_accuracy(raw),
+            'category_preferences': self._analyze_category_affinity(raw),
+            'completion_patterns': self._analyze_completion_patterns(raw),
+            'productivity_hours': self._analyze_productivity_patterns(raw),
+            'scheduling_habits': self._analyze_scheduling_habits(raw),
+            'priority_patterns': self._analyze_priority_patterns(raw)
         }
         
         return patterns
     
-    def _analyze_time_preferences(self, tasks) -> Dict[str, Any]:
-        """Analyze when user prefers to schedule different types of tasks"""
-        time_preferences = defaultdict(list)
+    def _collect_raw(self, tasks: List) -> _TaskPatternData:
+        """Walk the task history once, filling every accumulator the analyses need"""
+        raw = _TaskPatternData()
+        time_preferences = raw.time_preferences
+        category_ratio_sums = raw.category_ratio_sums
+        category_ratio_counts = raw.category_ratio_counts
+        category_totals = raw.category_totals
+        category_completed = raw.category_completed
+        satisfaction_sums = raw.satisfaction_sums
+        satisfaction_counts = raw.satisfaction_counts
+        completion_by_day = raw.completion_by_day
+        completion_by_hour = raw.completion_by_hour
+        created_by_hour = raw.created_by_hour
+        priority_completion = raw.priority_completion
+        priority_usage = raw.priority_usage
+        get_priority = _priority_getter(type(tasks[0])) if tasks else None
+        
+        for task in tasks:
+            category = task.category.name if task.category else 'uncategorized'
+            specific_time = task.specific_time
+            estimated = task.estimated_duration_minutes
+            actual = task.actual_time_spent_minutes
+            completed = task.status == 'completed'
+            
+            # Scheduling times and advance planning
+            if specific_time:
+                time_preferences[category].add(specific_time.hour)
+                raw.advance_planning.append((specific_time - task.created_at).total_seconds() / 3600)
+            
+            # Estimation accuracy
+            if estimated is not None and estimated > 0 and actual and actual > 0:
+                ratio = actual / estimated
+                raw.duration_ratios.append(ratio)
+                category_ratio_sums[category] += ratio
+                category_ratio_counts[category] += 1
+            
+            # Category affinity
+            category_totals[category] += 1
+            if completed:
+                category_completed[category] += 1
+                rating = task.user_satisfaction_rating
+                if rating:
+                    satisfaction_sums[category] += rating
+                    satisfaction_counts[category] += 1
+            
+            # Completion timing and procrastination
+            if completed and task.completed_at:
+                completed_at = task.completed_at
+                completion_by_day[completed_at.strftime('%A')] += 1
+                completion_by_hour[completed_at.hour] += 1
+                if task.deadline:
+                    raw.hours_before_deadline_total += (task.deadline - completed_at).total_seconds() / 3600
+                    raw.deadline_completions += 1
+            
+            created_by_hour[task.created_at.hour] += 1
+            
+            if estimated:
+                raw.preferred_durations.append(estimated)
+            
+            # Priority usage; base_priority with the legacy field as fallback
+            priority = get_priority(task)
+            priority_usage[priority] += 1
+            priority_completion[priority]['total'] += 1
+            if completed:
+                priority_completion[priority]['completed'] += 1
         
-        for task in tasks.filter(specific_time__isnull=False):
-            if task.specific_time:
-                hour = task.specific_time.hour
-                category = task.category.name if task.category else 'uncategorized'
-                time_preferences[category].append(hour)
+        return raw
+    
+    def _analyze_time_preferences(self, raw: _TaskPatternData) -> Dict[str, Any]:
+        """Analyze when user prefers to schedule different types of tasks"""
+        time_preferences = raw.time_preferences
         
         # Calculate preferred hours for each category
         preferred_hours = {}
         for category, hours in time_preferences.items():
-            if len(hours) >= 3:  # Need at least 3 data points
+            if hours.n >= 3:  # Need at least 3 data points
                 preferred_hours[category] = {
-                    'mean_hour': round(np.mean(hours), 1),
-                    'std_hour': round(np.std(hours), 1),
-                    'most_common': Counter(hours).most_common(3)
+                    'mean_hour': round(hours.mean, 1),
+                    'std_hour': round(hours.std, 1),
+                    'most_common': hours.counts.most_common(3)
                 }
         
         return {
@@ -68,79 +252,41 @@ class PersonalizationEngine:
             'overall_active_hours': self._get_most_active_hours(time_preferences)
         }
     
-    def _analyze_duration_accuracy(self, tasks) -> Dict[str, Any]:
+    def _analyze_duration_accuracy(self, raw: _TaskPatternData) -> Dict[str, Any]:
         """Analyze how accurate user's time estimates are"""
-        estimation_accuracy = []
-        
-        for task in tasks.filter(
-            estimated_duration_minutes__isnull=False,
-            actual_time_spent_minutes__gt=0
-        ):
-            estimated = task.estimated_duration_minutes
-            actual = task.actual_time_spent_minutes
-            
-            if estimated > 0:
-                accuracy_ratio = actual / estimated
-                estimation_accuracy.append({
-                    'task_id': task.id,
-                    'category': task.category.name if task.category else 'uncategorized',
-                    'estimated': estimated,
-                    'actual': actual,
-                    'ratio': accuracy_ratio
-                })
+        ratios = raw.duration_ratios
         
-        if not estimation_accuracy:
+        if not ratios:
             return {'insufficient_data': True}
         
         # Calculate statistics
-        ratios = [item['ratio'] for item in estimation_accuracy]
-        category_accuracy = defaultdict(list)
-        
-        for item in estimation_accuracy:
-            category_accuracy[item['category']].append(item['ratio'])
-        
+        mean_ratio = _mean(ratios)
         return {
             'overall_accuracy': {
-                'mean_ratio': round(np.mean(ratios), 2),
-                'median_ratio': round(np.median(ratios), 2),
-                'tends_to': 'underestimate' if np.mean(ratios) > 1.2 else 'overestimate' if np.mean(ratios) < 0.8 else 'accurate'
+                'mean_ratio': round(mean_ratio, 2),
+                'median_ratio': round(statistics.median(ratios), 2),
+                'tends_to': DURATION_ACCURACY_LABELS[(mean_ratio >= 0.8) + (mean_ratio > 1.2)]
             },
             'category_accuracy': {
                 cat: {
-                    'mean_ratio': round(np.mean(ratios), 2),
-                    'sample_size': len(ratios)
+                    'mean_ratio': round(raw.category_ratio_sums[cat] / count, 2),
+                    'sample_size': count
                 }
-                for cat, ratios in category_accuracy.items() if len(ratios) >= 2
+                for cat, count in raw.category_ratio_counts.items() if count >= 2
             }
         }
     
-    def _analyze_category_affinity(self, tasks) -> Dict[str, Any]:
+    def _analyze_category_affinity(self, raw: _TaskPatternData) -> Dict[str, Any]:
         """Analyze user's preference for different task categories"""
-        category_stats = defaultdict(lambda: {
-            'total_tasks': 0,
-            'completed_tasks': 0,
-            'avg_completion_time': 0,
-            'satisfaction_scores': []
-        })
-        
-        for task in tasks:
-            category = task.category.name if task.category else 'uncategorized'
-            stats = category_stats[category]
-            
-            stats['total_tasks'] += 1
-            
-            if task.status == 'completed':
-                stats['completed_tasks'] += 1
-                
-                if task.user_satisfaction_rating:
-                    stats['satisfaction_scores'].append(task.user_satisfaction_rating)
-        
         # Calculate affinity scores
         affinity_scores = {}
-        for category, stats in category_stats.items():
-            if stats['total_tasks'] >= 2:  # Need at least 2 tasks
-                completion_rate = stats['completed_tasks'] / stats['total_tasks']
-                avg_satisfaction = np.mean(stats['satisfaction_scores']) if stats['satisfaction_scores'] else 3.0
+        satisfaction_sums = raw.satisfaction_sums
+        satisfaction_counts = raw.satisfaction_counts
+        for category, total in raw.category_totals.items():
+            if total >= 2:  # Need at least 2 tasks
+                completion_rate = raw.category_completed.get(category, 0) / total
+                rated = satisfaction_counts.get(category, 0)
+                avg_satisfaction = satisfaction_sums[category] / rated if rated else 3.0
                 
                 # Affinity score combines completion rate and satisfaction
                 affinity_score = (completion_rate * 0.6) + (avg_satisfaction / 5.0 * 0.4)
@@ -149,83 +295,49 @@ class PersonalizationEngine:
                     'affinity_score': round(affinity_score, 2),
                     'completion_rate': round(completion_rate, 2),
                     'avg_satisfaction': round(avg_satisfaction, 1),
-                    'sample_size': stats['total_tasks']
+                    'sample_size': total
                 }
         
         return {
             'category_affinity': affinity_scores,
-            'preferred_categories': sorted(
+            'preferred_categories': heapq.nlargest(
+                3,
                 affinity_scores.items(),
-                key=lambda x: x[1]['affinity_score'],
-                reverse=True
-            )[:3]
+                key=lambda x: x[1]['affinity_score']
+            )
         }
     
-    def _analyze_completion_patterns(self, tasks) -> Dict[str, Any]:
+    def _analyze_completion_patterns(self, raw: _TaskPatternData) -> Dict[str, Any]:
         """Analyze when and how user completes tasks"""
-        completion_patterns = {
-            'completion_by_day': defaultdict(int),
-            'completion_by_hour': defaultdict(int),
-            'completion_streaks': [],
-            'procrastination_patterns': []
-        }
-        
-        completed_tasks = tasks.filter(status='completed', completed_at__isnull=False)
-        
-        for task in completed_tasks:
-            # Day of week patterns
-            day_of_week = task.completed_at.strftime('%A')
-            completion_patterns['completion_by_day'][day_of_week] += 1
-            
-            # Hour of day patterns
-            hour = task.completed_at.hour
-            completion_patterns['completion_by_hour'][hour] += 1
-            
-            # Procrastination analysis
-            if task.deadline:
-                time_diff = task.deadline - task.completed_at
-                hours_before_deadline = time_diff.total_seconds() / 3600
-                completion_patterns['procrastination_patterns'].append(hours_before_deadline)
-        
         return {
-            'most_productive_days': sorted(
-                completion_patterns['completion_by_day'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:3],
-            'most_productive_hours': sorted(
-                completion_patterns['completion_by_hour'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:3],
+            'most_productive_days': heapq.nlargest(3, raw.completion_by_day.items(), key=itemgetter(1)),
+            'most_productive_hours': heapq.nlargest(3, raw.completion_by_hour.items(), key=itemgetter(1)),
             'procrastination_tendency': self._analyze_procrastination(
-                completion_patterns['procrastination_patterns']
+                raw.hours_before_deadline_total,
+                raw.deadline_completions
             )
         }
     
-    def _analyze_productivity_patterns(self, tasks) -> Dict[str, Any]:
+    def _analyze_productivity_patterns(self, raw: _TaskPatternData) -> Dict[str, Any]:
         """Identify user's most and least productive periods"""
-        productivity_by_hour = defaultdict(lambda: {'completed': 0, 'created': 0})
-        
-        # Completed tasks by hour
-        for task in tasks.filter(status='completed', completed_at__isnull=False):
-            hour = task.completed_at.hour
-            productivity_by_hour[hour]['completed'] += 1
+        completed_by_hour = raw.completion_by_hour
+        created_by_hour = raw.created_by_hour
         
-        # Created tasks by hour
-        for task in tasks:
-            hour = task.created_at.hour
-            productivity_by_hour[hour]['created'] += 1
+        # Hours with completions first, then the remaining creation hours
+        hours = dict.fromkeys(completed_by_hour)
+        hours.update(dict.fromkeys(created_by_hour))
         
         # Calculate productivity ratios
         productivity_ratios = {}
-        for hour, stats in productivity_by_hour.items():
-            if stats['created'] > 0:
-                ratio = stats['completed'] / stats['created']
+        for hour in hours:
+            created = created_by_hour.get(hour, 0)
+            if created > 0:
+                completed = completed_by_hour.get(hour, 0)
+                ratio = completed / created
                 productivity_ratios[hour] = {
                     'completion_ratio': round(ratio, 2),
-                    'completed_count': stats['completed'],
-                    'created_count': stats['created']
+                    'completed_count': completed,
+                    'created_count': created
                 }
         
         # Sort by productivity
@@ -241,57 +353,28 @@ class PersonalizationEngine:
             'productivity_by_hour': productivity_ratios
         }
     
-    def _analyze_scheduling_habits(self, tasks) -> Dict[str, Any]:
+    def _analyze_scheduling_habits(self, raw: _TaskPatternData) -> Dict[str, Any]:
         """Analyze user's scheduling habits and preferences"""
-        habits = {
-            'advance_planning': [],  # How far in advance user plans
-            'preferred_durations': [],  # Preferred task durations
-            'break_patterns': [],  # Time between tasks
-            'batch_scheduling': {}  # Tendency to batch similar tasks
-        }
-        
-        # Advance planning analysis
-        for task in tasks.filter(specific_time__isnull=False):
-            if task.specific_time:
-                advance_time = task.specific_time - task.created_at
-                advance_hours = advance_time.total_seconds() / 3600
-                habits['advance_planning'].append(advance_hours)
-        
-        # Duration preferences
-        for task in tasks:
-            if task.estimated_duration_minutes:
-                habits['preferred_durations'].append(task.estimated_duration_minutes)
+        advance_planning = raw.advance_planning  # How far in advance user plans
+        preferred_durations = raw.preferred_durations  # Preferred task durations
         
         return {
             'planning_horizon': {
-                'avg_advance_hours': round(np.mean(habits['advance_planning']), 1) if habits['advance_planning'] else None,
-                'planning_style': self._categorize_planning_style(habits['advance_planning'])
+                'avg_advance_hours': round(_mean(advance_planning), 1) if advance_planning else None,
+                'planning_style': self._categorize_planning_style(advance_planning)
             },
             'duration_preferences': {
-                'avg_duration': round(np.mean(habits['preferred_durations']), 0) if habits['preferred_durations'] else None,
-                'preferred_range': self._get_duration_range_preference(habits['preferred_durations'])
+                'avg_duration': round(_mean(preferred_durations), 0) if preferred_durations else None,
+                'preferred_range': self._get_duration_range_preference(preferred_durations)
             }
         }
     
-    def _analyze_priority_patterns(self, tasks) -> Dict[str, Any]:
+    def _analyze_priority_patterns(self, raw: _TaskPatternData) -> Dict[str, Any]:
         """Analyze how user assigns and handles priorities"""
-        priority_usage = Counter(task.base_priority for task in tasks if hasattr(task, 'base_priority'))
-        
-        # Fallback to legacy priority field if base_priority doesn't exist
-        if not priority_usage:
-            priority_usage = Counter(task.priority for task in tasks)
-        
-        # Completion rates by priority
-        priority_completion = defaultdict(lambda: {'total': 0, 'completed': 0})
-        
-        for task in tasks:
-            priority = getattr(task, 'base_priority', task.priority)
-            priority_completion[priority]['total'] += 1
-            if task.status == 'completed':
-                priority_completion[priority]['completed'] += 1
+        priority_usage = raw.priority_usage
         
         completion_rates = {}
-        for priority, stats in priority_completion.items():
+        for priority, stats in raw.priority_completion.items():
             if stats['total'] > 0:
                 completion_rates[priority] = round(stats['completed'] / stats['total'], 2)
         
@@ -301,9 +384,26 @@ class PersonalizationEngine:
             'priority_effectiveness': self._analyze_priority_effectiveness(completion_rates)
         }
     
+    def get_user_patterns(self, user) -> Dict[str, Any]:
+        """User patterns from the stored snapshot, recomputed when dirty or stale"""
+        from .models import UserPatternSnapshot
+        
+        snapshot, _ = UserPatternSnapshot.objects.get_or_create(user=user)
+        if not snapshot.dirty and snapshot.refreshed_at >= timezone.now() - PATTERN_SNAPSHOT_MAX_AGE:
+            return _restore_int_keys(snapshot.patterns)
+        
+        # Only mark the result fresh if no task changed while it was computed;
+        # otherwise it is stored but stays dirty for the next call
+        patterns = self.analyze_user_patterns(user)
+        fields = {'patterns': patterns, 'refreshed_at': timezone.now()}
+        if not UserPatternSnapshot.objects.filter(
+                pk=snapshot.pk, generation=snapshot.generation).update(dirty=False, **fields):
+            UserPatternSnapshot.objects.filter(pk=snapshot.pk).update(**fields)
+        return patterns
+    
     def generate_personalized_suggestions(self, user, current_tasks: List) -> Dict[str, Any]:
         """Generate personalized suggestions based on user patterns"""
-        patterns = self.analyze_user_patterns(user)
+        patterns = self.get_user_patterns(user)
         
         suggestions = {
             'scheduling_suggestions': self._generate_scheduling_suggestions(patterns, current_tasks),
@@ -329,8 +429,8 @@ class PersonalizationEngine:
                 })
         
         # Duration suggestions
-        if 'duration_accuracy' in patterns:
-            accuracy = patterns['duration_accuracy']
+        accuracy = patterns.get('duration_accuracy')
+        if accuracy is not None:
             if not accuracy.get('insufficient_data'):
                 tends_to = accuracy['overall_accuracy']['tends_to']
                 if tends_to != 'accurate':
@@ -347,8 +447,9 @@ class PersonalizationEngine:
         tips = []
         
         # Category affinity tips
-        if 'category_preferences' in patterns:
-            preferred_cats = patterns['category_preferences'].get('preferred_categories', [])
+        category_prefs = patterns.get('category_preferences')
+        if category_prefs is not None:
+            preferred_cats = category_prefs.get('preferred_categories')
             if preferred_cats:
                 tips.append({
                     'type': 'category_focus',
@@ -363,8 +464,10 @@ class PersonalizationEngine:
         suggestions = []
         
         # Planning suggestions
-        if 'scheduling_habits' in patterns:
-            planning_style = patterns['scheduling_habits']['planning_horizon']['planning_style']
+        habits = patterns.get('scheduling_habits') or {}
+        horizon = habits.get('planning_horizon') or {}
+        planning_style = horizon.get('planning_style')
+        if planning_style is not None:
             if planning_style == 'last_minute':
                 suggestions.append({
                     'type': 'planning_improvement',
@@ -379,19 +482,15 @@ class PersonalizationEngine:
         defaults = {}
         
         # Default duration based on category
-        if 'category_preferences' in patterns:
-            category_prefs = patterns['category_preferences'].get('category_affinity', {})
-            duration_defaults = {}
-            
-            for category, stats in category_prefs.items():
-                # This would need to be calculated from historical data
-                duration_defaults[category] = 60  # Default fallback
-            
-            defaults['duration_by_category'] = duration_defaults
+        category_prefs = patterns.get('category_preferences')
+        if category_prefs is not None:
+            # This would need to be calculated from historical data; 60 is the fallback
+            defaults['duration_by_category'] = dict.fromkeys(category_prefs.get('category_affinity', {}), 60)
         
         # Default priority based on completion patterns
-        if 'priority_patterns' in patterns:
-            effectiveness = patterns['priority_patterns'].get('priority_effectiveness', {})
+        priority_patterns = patterns.get('priority_patterns')
+        if priority_patterns is not None:
+            effectiveness = priority_patterns.get('priority_effectiveness')
             if effectiveness:
                 best_priority = max(effectiveness, key=effectiveness.get)
                 defaults['suggested_priority'] = best_priority
@@ -401,35 +500,23 @@ class PersonalizationEngine:
     # Helper methods for analysis
     def _get_most_active_hours(self, time_preferences: Dict) -> List[int]:
         """Get the most active hours across all categories"""
-        all_hours = []
-        for hours_list in time_preferences.values():
-            all_hours.extend(hours_list)
-        
-        if all_hours:
-            hour_counts = Counter(all_hours)
-            return [hour for hour, count in hour_counts.most_common(3)]
-        return []
+        hour_counts = Counter()
+        for hours in time_preferences.values():
+            hour_counts.update(hours.counts)
+        
+        return [hour for hour, count in hour_counts.most_common(3)]
     
-    def _analyze_procrastination(self, completion_times: List[float]) -> Dict[str, Any]:
-        """Analyze procrastination patterns"""
-        if not completion_times:
+    def _analyze_procrastination(self, total_hours_before: float, sample_size: int) -> Dict[str, Any]:
+        """Analyze procrastination patterns from the summed hours left before deadlines"""
+        if not sample_size:
             return {'insufficient_data': True}
         
-        avg_hours_before = np.mean(completion_times)
-        
-        if avg_hours_before < 6:
-            tendency = 'last_minute'
-        elif avg_hours_before < 24:
-            tendency = 'day_of'
-        elif avg_hours_before < 72:
-            tendency = 'few_days_early'
-        else:
-            tendency = 'well_planned'
+        avg_hours_before = total_hours_before / sample_size
         
         return {
             'avg_hours_before_deadline': round(avg_hours_before, 1),
-            'tendency': tendency,
-            'sample_size': len(completion_times)
+            'tendency': PROCRASTINATION_LABELS[bisect.bisect_right(PROCRASTINATION_HOUR_BOUNDS, avg_hours_before)],
+            'sample_size': sample_size
         }
     
     def _categorize_planning_style(self, advance_times: List[float]) -> str:
@@ -437,30 +524,16 @@ class PersonalizationEngine:
         if not advance_times:
             return 'unknown'
         
-        avg_advance = np.mean(advance_times)
-        
-        if avg_advance < 2:
-            return 'last_minute'
-        elif avg_advance < 24:
-            return 'same_day'
-        elif avg_advance < 72:
-            return 'few_days_ahead'
-        else:
-            return 'long_term_planner'
+        avg_advance = _mean(advance_times)
+        return PLANNING_STYLE_LABELS[bisect.bisect_right(PLANNING_HOUR_BOUNDS, avg_advance)]
     
     def _get_duration_range_preference(self, durations: List[int]) -> str:
         """Get preferred duration range"""
         if not durations:
             return 'unknown'
         
-        avg_duration = np.mean(durations)
-        
-        if avg_duration < 30:
-            return 'short_tasks'  # < 30 minutes
-        elif avg_duration < 90:
-            return 'medium_tasks'  # 30-90 minutes
-        else:
-            return 'long_tasks'  # > 90 minutes
+        avg_duration = _mean(durations)
+        return DURATION_RANGE_LABELS[bisect.bisect_right(DURATION_RANGE_BOUNDS, avg_duration)]
     
     def _analyze_priority_effectiveness(self, completion_rates: Dict) -> Dict[str, Any]:
         """Analyze which priorities are most effective for the user"""
@@ -478,21 +551,20 @@ class PersonalizationEngine:
     
     def update_user_preferences(self, user, new_feedback: Dict[str, Any]) -> bool:
         """Update user preferences based on new feedback"""
+        from .models import UserPreferences
+        
+        # Update preferences based on feedback
+        defaults = {}
+        if 'preferred_duration' in new_feedback:
+            defaults['default_task_duration'] = new_feedback['preferred_duration']
+        
+        if 'productive_hours' in new_feedback:
+            defaults['most_productive_hours'] = new_feedback['productive_hours']
+        
+        # update_or_create only writes the columns in defaults
         try:
-            from .models import UserPreferences
-            
-            preferences, created = UserPreferences.objects.get_or_create(user=user)
-            
-            # Update preferences based on feedback
-            if 'preferred_duration' in new_feedback:
-                preferences.default_task_duration = new_feedback['preferred_duration']
-            
-            if 'productive_hours' in new_feedback:
-                preferences.most_productive_hours = new_feedback['productive_hours']
-            
-            preferences.save()
-            return True
-            
-        except Exception as e:
-            print(f"Error updating preferences: {e}")
-            return False
\ No newline at end of file
+            UserPreferences.objects.update_or_create(user=user, defaults=defaults)
+        except (DatabaseError, TypeError, ValueError):  # Also bad feedback values
+            logger.exception("Error updating preferences for user %s", user.id)
+            return False
+        return True
\ No newline at end of file
@@ -6,7 +6,7 @@
 
 # backend/deeptalk/scheduling_engine.py - Advanced EDF/HPF Implementation
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from .models import Task, TimeBlock, UserPreferences
 
@@ -26,8 +26,19 @@ class SmartSchedulingEngine:
         except UserPreferences.DoesNotExist:
             return UserPreferences.objects.create(user=self.user)
     
+    @classmethod
+    def prepare_tasks_qs(cls, user):
+        """Open tasks of a user, with the category joined in for calculated_priority"""
+        return Task.objects.filter(
+            user=user, status__in=['pending', 'in_progress']
+        ).select_related('category')
+    
     def generate_optimal_schedule(self, tasks: List[Task], time_horizon_days: int = 7) -> Dict[str, Any]:
-        """Generate optimal schedule using hybrid EDF/HPF algorithm"""
+        """Generate optimal schedule using hybrid EDF/HPF algorithm
+        
+        HPF reads task.calculated_priority, which follows task.category, so
+        tasks should come from prepare_tasks_qs() to avoid a query per task.
+        """
         
         # Get available time blocks
         time_blocks = self._generate_time_blocks(time_horizon_days)
@@ -54,20 +65,22 @@ class SmartSchedulingEngine:
         deadline_tasks.sort(key=lambda x: x.deadline)
         
         scheduled = []
-        remaining_blocks = time_blocks.copy()
+        used = [False] * len(time_blocks)
+        profile = self._profile_blocks(time_blocks)
         
         for task in deadline_tasks:
-            best_block = self._find_best_block_for_task(task, remaining_blocks)
-            if best_block:
+            best_index = self._find_best_block_for_task(task, time_blocks, used, profile)
+            if best_index is not None:
                 scheduled.append({
                     'task': task,
-                    'time_block': best_block,
+                    'time_block': time_blocks[best_index],
                     'algorithm': 'EDF',
                     'urgency_score': self._calculate_urgency_score(task)
                 })
-                remaining_blocks.remove(best_block)
+                used[best_index] = True
         
         remaining_tasks = [t for t in tasks if t not in [s['task'] for s in scheduled]]
+        remaining_blocks = [block for block, taken in zip(time_blocks, used) if not taken]
         
         return {
             'scheduled_tasks': scheduled,
@@ -81,81 +94,96 @@ class SmartSchedulingEngine:
         tasks.sort(key=lambda x: x.calculated_priority, reverse=True)
         
         scheduled = []
-        remaining_blocks = time_blocks.copy()
+        used = [False] * len(time_blocks)
+        profile = self._profile_blocks(time_blocks)
         
         for task in tasks:
-            best_block = self._find_best_block_for_task(task, remaining_blocks)
-            if best_block:
+            best_index = self._find_best_block_for_task(task, time_blocks, used, profile)
+            if best_index is not None:
                 scheduled.append({
                     'task': task,
-                    'time_block': best_block,
+                    'time_block': time_blocks[best_index],
                     'algorithm': 'HPF',
                     'priority_score': task.calculated_priority
                 })
-                remaining_blocks.remove(best_block)
+                used[best_index] = True
         
         return scheduled
     
-    def _find_best_block_for_task(self, task: Task, available_blocks: List[TimeBlock]) -> TimeBlock:
-        """Find the best time block for a given task"""
-        suitable_blocks = []
-        
-        for block in available_blocks:
-            if self._is_block_suitable_for_task(task, block):
-                score = self._calculate_block_task_score(task, block)
-                suitable_blocks.append((block, score))
-        
-        if suitable_blocks:
-            # Return block with highest score
-            return max(suitable_blocks, key=lambda x: x[1])[0]
-        
-        return None
+    def _profile_blocks(self, time_blocks: List[TimeBlock]) -> Tuple[List[int], List[int], List[float]]:
+        """Start hours, durations and weighted productive-hours scores of the blocks.
+        
+        None of these depend on the task, so each pass computes them once
+        rather than once per (task, block) pair.
+        """
+        hours = [block.start_time.hour for block in time_blocks]
+        durations = [block.duration_minutes for block in time_blocks]
+        productive = [self._calculate_productive_hours_alignment(block) * 0.1 for block in time_blocks]
+        return hours, durations, productive
+    
+    def _find_best_block_for_task(self, task: Task, blocks: List[TimeBlock], used: List[bool],
+                                  profile: Tuple[List[int], List[int], List[float]]) -> Optional[int]:
+        """Find the index of the best unused time block for a given task"""
+        hours, durations, productive = profile
+        preferred, avoid = self._parse_task_hours(task)
+        preferred_window = range(min(preferred), max(preferred) + 1) if preferred else None
+        best_index = None
+        best_score = None
+        
+        for i, block in enumerate(blocks):
+            if used[i] or not self._is_block_suitable_for_task(task, hours[i], durations[i], preferred_window, avoid):
+                continue
+            score = self._calculate_block_task_score(task, block, durations[i], hours[i] in preferred) + productive[i]
+            # Strict comparison keeps the earliest block on ties
+            if best_score is None or score > best_score:
+                best_index, best_score = i, score
+        
+        return best_index
     
-    def _is_block_suitable_for_task(self, task: Task, block: TimeBlock) -> bool:
-        """Check if a time block is suitable for a task"""
+    @staticmethod
+    def _parse_task_hours(task: Task) -> Tuple[frozenset, frozenset]:
+        """Preferred and avoided start hours of a task, parsed from its 'HH:MM' lists"""
+        preferred = frozenset(int(t.split(':')[0]) for t in task.preferred_time_of_day or ())
+        avoid = frozenset(int(t.split(':')[0]) for t in task.avoid_time_of_day or ())
+        return preferred, avoid
+    
+    def _is_block_suitable_for_task(self, task: Task, block_hour: int, block_duration: int,
+                                    preferred_window: Optional[range], avoid: frozenset) -> bool:
+        """Check if a time block, given its start hour and duration, is suitable for a task"""
         # Duration check
-        if block.duration_minutes < task.estimated_duration_minutes:
+        if block_duration < task.estimated_duration_minutes:
             return False
         
         # Time preference check
-        if task.preferred_time_of_day:
-            block_hour = block.start_time.hour
-            preferred_hours = [int(t.split(':')[0]) for t in task.preferred_time_of_day]
-            if block_hour not in range(min(preferred_hours), max(preferred_hours) + 1):
-                return False
+        if preferred_window is not None and block_hour not in preferred_window:
+            return False
         
         # Avoid time check
-        if task.avoid_time_of_day:
-            block_hour = block.start_time.hour
-            avoid_hours = [int(t.split(':')[0]) for t in task.avoid_time_of_day]
-            if block_hour in avoid_hours:
-                return False
+        if block_hour in avoid:
+            return False
         
         return True
     
-    def _calculate_block_task_score(self, task: Task, block: TimeBlock) -> float:
-        """Calculate compatibility score between task and time block"""
+    def _calculate_block_task_score(self, task: Task, block: TimeBlock, block_duration: int,
+                                    is_preferred_hour: bool) -> float:
+        """Calculate the task-dependent part of the compatibility score between task and time block.
+        
+        The productive-hours term only depends on the block and comes from _profile_blocks.
+        """
         score = 0.0
         
         # Duration efficiency (prefer blocks that match task duration closely)
-        duration_efficiency = task.estimated_duration_minutes / block.duration_minutes
+        duration_efficiency = task.estimated_duration_minutes / block_duration
         score += duration_efficiency * 0.3
         
         # Time preference alignment
-        if task.preferred_time_of_day:
-            block_hour = block.start_time.hour
-            preferred_hours = [int(t.split(':')[0]) for t in task.preferred_time_of_day]
-            if block_hour in preferred_hours:
-                score += 0.4
+        if is_preferred_hour:
+            score += 0.4
         
         # Energy level alignment (morning tasks for high energy, etc.)
         energy_alignment = self._calculate_energy_alignment(task, block)
         score += energy_alignment * 0.2
         
-        # User's productive hours
-        productive_hours_alignment = self._calculate_productive_hours_alignment(block)
-        score += productive_hours_alignment * 0.1
-        
         return score
     
     def _generate_recommendations(self, schedule: List[Dict]) -> List[str]:
@@ -182,32 +210,15 @@ class SmartSchedulingEngine:
 # =====================================================
 
 # backend/deeptalk/advanced_nlp.py - Enhanced NLP capabilities
-class AdvancedNLPProcessor:
-    """Advanced natural language processing for complex queries"""
-    
-    def __init__(self, ollama_agent):
-        self.agent = ollama_agent
-    
-    def process_complex_query(self, user_input: str, context: Dict) -> Dict:
-        """Handle complex, multi-step queries"""
-        
-        # Detect query complexity
-        complexity = self._analyze_query_complexity(user_input)
-        
-        if complexity == 'multi_step':
-            return self._handle_multi_step_query(user_input, context)
-        elif complexity == 'conditional':
-            return self._handle_conditional_query(user_input, context)
-        elif complexity == 'bulk_operation':
-            return self._handle_bulk_operation(user_input, context)
-        else:
-            return self._handle_simple_query(user_input, context)
-    
-    def _handle_multi_step_query(self, user_input: str, context: Dict) -> Dict:
-        """Handle queries like 'Schedule gym, then dinner, then study'"""
-        prompt = f"""Break down this multi-step request into individual tasks:
+import hashlib
+import re
+from collections import Counter
+from django.core.cache import cache as django_cache
+from .ollama_task_agent import EXTRACTION_TEMPERATURE, clean_json_response, extract_first_json
 
-User request: "{user_input}"
+# Prompt templates: the static instructions come first and the user input last,
+# so every request shares the same prompt prefix
+MULTI_STEP_PROMPT = """Break down a multi-step request into individual tasks.
 
 Extract each task and respond with JSON:
 {{
@@ -221,20 +232,11 @@ Extract each task and respond with JSON:
         }}
     ],
     "sequence_type": "sequential|parallel|flexible"
-}}"""
-        
-        try:
-            response = self.agent.llm._call(prompt, temperature=0.3)
-            # Parse and process multiple tasks
-            return self._process_multi_task_response(response)
-        except Exception as e:
-            return {'error': f'Failed to process multi-step query: {str(e)}'}
-    
-    def _handle_conditional_query(self, user_input: str, context: Dict) -> Dict:
-        """Handle queries like 'If it rains, reschedule outdoor meeting to conference room'"""
-        prompt = f"""Analyze this conditional request:
+}}
+
+User request: "{user_input}\""""
 
-User request: "{user_input}"
+CONDITIONAL_PROMPT = """Analyze a conditional request.
 
 Extract the condition and actions:
 {{
@@ -243,16 +245,11 @@ Extract the condition and actions:
     "if_false_action": "What to do if condition is not met",
     "requires_monitoring": true/false,
     "check_frequency": "hourly|daily|weekly"
-}}"""
-        
-        # Process conditional logic
-        return self._create_conditional_task(user_input)
-    
-    def _handle_bulk_operation(self, user_input: str, context: Dict) -> Dict:
-        """Handle queries like 'Delete all completed tasks from last week'"""
-        prompt = f"""Analyze this bulk operation request:
+}}
 
-User request: "{user_input}"
+User request: "{user_input}\""""
+
+BULK_OPERATION_PROMPT = """Analyze a bulk operation request.
 
 Identify the operation:
 {{
@@ -265,8 +262,117 @@ Identify the operation:
     }},
     "confirmation_required": true/false,
     "estimated_affected_count": "approximate number"
-}}"""
+}}
+
+User request: "{user_input}\""""
+
+NLP_RESULT_CACHE_TIMEOUT = 3600
+
+# Phrase markers per query type; a query takes the type with the most markers.
+# Bare 'next', 'every' and 'all' also occur in single-task requests, so they are not markers
+QUERY_COMPLEXITY_KEYWORDS = {
+    'multi_step': ('and then', 'after that', 'followed by', 'afterwards', 'then'),
+    'conditional': ('in case', 'as long as', 'otherwise', 'unless', 'if'),
+    'bulk_operation': ('delete all', 'complete all', 'move all', 'last week', 'last month'),
+}
+
+# All markers in one alternation, one named group per type, so a single
+# left-to-right scan classifies the input
+_QUERY_COMPLEXITY_RE = re.compile(
+    "|".join(
+        rf"(?P<{kind}>\b(?:{'|'.join(map(re.escape, phrases))})\b)"
+        for kind, phrases in QUERY_COMPLEXITY_KEYWORDS.items()
+    ),
+    re.IGNORECASE
+)
+
+
+# Connective and filler words; every other word of the input is part of its signature
+_INPUT_FILLER_WORDS = frozenset((
+    'a', 'an', 'the', 'and', 'then', 'after', 'that', 'afterwards', 'next', 'followed', 'by',
+    'please', 'can', 'could', 'would', 'you', 'i', 'me', 'my',
+))
+_INPUT_WORD_RE = re.compile(r"[\w':]+")
+
+
+def _input_signature(text: str) -> tuple:
+    """Content words of an input in order: the names, times and other values a task
+    extraction depends on. Inputs with the same signature share a cached result."""
+    return tuple(word for word in _INPUT_WORD_RE.findall(text.lower()) if word not in _INPUT_FILLER_WORDS)
+
+
+def _prompt_cache_key(template_id: str, user_input: str) -> str:
+    """Shared-cache key for a (template, input signature) pair"""
+    material = "\0".join((template_id, *_input_signature(user_input))).encode()
+    return f"deeptalk:nlp:{hashlib.blake2b(material, digest_size=16).hexdigest()}"
+
+
+class AdvancedNLPProcessor:
+    """Advanced natural language processing for complex queries"""
+    
+    def __init__(self, ollama_agent):
+        self.agent = ollama_agent
+    
+    def _cached_llm_result(self, template_id: str, prompt_template: str, user_input: str, parse) -> Any:
+        """Parsed LLM result for user_input, shared by rephrasings with the same signature"""
+        key = _prompt_cache_key(template_id, user_input)
+        result = django_cache.get(key)
+        if result is None:
+            prompt = prompt_template.format(user_input=user_input)
+            result = parse(self.agent.llm._call(prompt, temperature=EXTRACTION_TEMPERATURE))
+            if result is not None:
+                django_cache.set(key, result, NLP_RESULT_CACHE_TIMEOUT)
+        return result
+    
+    def _analyze_query_complexity(self, user_input: str) -> str:
+        """Classify a query as multi_step, conditional, bulk_operation or simple"""
+        scores = Counter(match.lastgroup for match in _QUERY_COMPLEXITY_RE.finditer(user_input))
+        return scores.most_common(1)[0][0] if scores else 'simple'
+    
+    def process_complex_query(self, user_input: str, context: Dict) -> Dict:
+        """Handle complex, multi-step queries"""
         
+        # Detect query complexity
+        complexity = self._analyze_query_complexity(user_input)
+        
+        if complexity == 'multi_step':
+            return self._handle_multi_step_query(user_input, context)
+        elif complexity == 'conditional':
+            return self._handle_conditional_query(user_input, context)
+        elif complexity == 'bulk_operation':
+            return self._handle_bulk_operation(user_input, context)
+        else:
+            return self._handle_simple_query(user_input, context)
+    
+    def _handle_multi_step_query(self, user_input: str, context: Dict) -> Dict:
+        """Handle queries like 'Schedule gym, then dinner, then study'"""
+        try:
+            # Parse and process multiple tasks; repeated requests reuse the parsed result
+            return self._cached_llm_result(
+                'multi_step', MULTI_STEP_PROMPT, user_input, self._process_multi_task_response
+            )
+        except Exception as e:
+            return {'error': f'Failed to process multi-step query: {str(e)}'}
+    
+    def _process_multi_task_response(self, response: str) -> Dict:
+        """Tasks and sequence type from the LLM's multi-step breakdown"""
+        data = extract_first_json(clean_json_response(response))
+        if not isinstance(data, dict) or not isinstance(data.get('tasks'), list):
+            raise ValueError("no task breakdown in LLM response")
+        return {
+            'tasks': sorted(data['tasks'], key=lambda t: t.get('order', 0)),
+            'sequence_type': data.get('sequence_type', 'sequential')
+        }
+    
+    def _handle_conditional_query(self, user_input: str, context: Dict) -> Dict:
+        """Handle queries like 'If it rains, reschedule outdoor meeting to conference room'"""
+        # CONDITIONAL_PROMPT describes the extraction; it isn't sent to the LLM yet
+        # Process conditional logic
+        return self._create_conditional_task(user_input)
+    
+    def _handle_bulk_operation(self, user_input: str, context: Dict) -> Dict:
+        """Handle queries like 'Delete all completed tasks from last week'"""
+        # BULK_OPERATION_PROMPT describes the extraction; it isn't sent to the LLM yet
         return self._process_bulk_operation(user_input)
 
 # 3. SMART NOTIFICATIONS & REMINDERS
@@ -278,24 +384,42 @@ from django.core.mail import send_mail
 from django.utils import timezone
 from datetime import timedelta
 
+from django.core.cache import cache
+from .models import completion_patterns_key
+
+# Completion patterns change slowly; completing a task also drops them
+COMPLETION_PATTERNS_CACHE_TIMEOUT = 300
+
+# Static instructions first, per-reminder fields last
+REMINDER_PROMPT = """Generate a personalized reminder message. Make it motivating and helpful, not annoying.
+
+Task: {task_name}
+User: {first_name}
+Urgency: {urgency}
+Time until deadline: {time_until_deadline}"""
+
 class SmartNotificationEngine:
     """Intelligent notification system with ML-based timing"""
     
+    # Reminders generated at once for a task; keeps the local model from being flooded
+    REMINDER_CONCURRENCY = 4
+    
     def __init__(self):
         self.notification_rules = self._load_notification_rules()
     
     async def schedule_smart_reminders(self, task: Task, user: 'DeepTalkUser') -> List[Dict]:
         """Schedule intelligent reminders based on task importance and user behavior"""
-        reminders = []
-        
         # Analyze optimal reminder timing
         optimal_times = await self._calculate_optimal_reminder_times(task, user)
         
-        for reminder_time in optimal_times:
-            reminder = await self._create_smart_reminder(task, user, reminder_time)
-            reminders.append(reminder)
+        # The reminders are independent: generate them concurrently, in time order
+        semaphore = asyncio.Semaphore(self.REMINDER_CONCURRENCY)
+        
+        async def create_reminder(reminder_time):
+            async with semaphore:
+                return await self._create_smart_reminder(task, user, reminder_time)
         
-        return reminders
+        return list(await asyncio.gather(*(create_reminder(t) for t in optimal_times)))
     
     async def _calculate_optimal_reminder_times(self, task: Task, user: 'DeepTalkUser') -> List[datetime]:
         """Use ML to determine optimal reminder times"""
@@ -314,7 +438,7 @@ class SmartNotificationEngine:
                 ])
         
         # User behavior-based reminders
-        user_patterns = await self._analyze_user_completion_patterns(user)
+        user_patterns = await self._get_user_completion_patterns(user)
         if user_patterns['procrastination_tendency'] > 0.7:
             # Add earlier reminders for procrastinators
             if task.deadline:
@@ -322,6 +446,15 @@ class SmartNotificationEngine:
         
         return sorted(set(times))
     
+    async def _get_user_completion_patterns(self, user: 'DeepTalkUser') -> Dict:
+        """User completion patterns, cached per user instead of re-analyzed per task"""
+        key = completion_patterns_key(user.id)
+        patterns = await cache.aget(key)
+        if patterns is None:
+            patterns = await self._analyze_user_completion_patterns(user)
+            await cache.aset(key, patterns, COMPLETION_PATTERNS_CACHE_TIMEOUT)
+        return patterns
+    
     async def _create_smart_reminder(self, task: Task, user: 'DeepTalkUser', reminder_time: datetime) -> Dict:
         """Create an intelligent reminder with context"""
         
@@ -351,16 +484,7 @@ class SmartNotificationEngine:
         else:
             urgency = "gentle"
         
-        # Use AI to generate personalized message
-        prompt = f"""Generate a personalized reminder message for:
-        
-Task: {task.name}
-User: {user.user.first_name}
-Urgency: {urgency}
-Time until deadline: {time_until_deadline}
-
-Make it motivating and helpful, not annoying."""
-        
+        # REMINDER_PROMPT is rendered once the Ollama agent generates the message
         try:
             # This would use your Ollama agent
             ai_message = "Don't forget about your task!"  # Fallback
@@ -372,18 +496,45 @@ Make it motivating and helpful, not annoying."""
 # =====================================================
 
 # backend/deeptalk/analytics_engine.py
-from django.db.models import Count, Avg, Sum
+import math
+from django.db.models import Count, Avg, Sum, Q, Max
+from django.db.models.functions import ExtractHour, TruncDate
+from asgiref.sync import sync_to_async
 from datetime import datetime, timedelta
 import json
 
+# Reports are reused until one of the user's tasks changes, or for at most this long
+REPORT_CACHE_TIMEOUT = 600
+
 class ProductivityAnalytics:
     """Advanced analytics for productivity insights"""
     
+    # Task columns the report reads
+    REPORT_TASK_FIELDS = (
+        'id', 'status', 'completed_at', 'deadline', 'category__name', 'base_priority', 'created_at',
+    )
+    
     def __init__(self, user):
         self.user = user
     
-    def generate_comprehensive_report(self, time_period: str = 'month') -> Dict[str, Any]:
-        """Generate comprehensive productivity report"""
+    async def agenerate_comprehensive_report(self, time_period: str = 'month') -> Dict[str, Any]:
+        """Generate comprehensive productivity report, cached per task version"""
+        # Any save moves the latest updated_at and any delete changes the count, so the
+        # version follows the database in every process, whatever the cache backend
+        version = await Task.objects.filter(user=self.user).aaggregate(
+            updated=Max('updated_at'), count=Count('id')
+        )
+        updated = version['updated'].timestamp() if version['updated'] else 0
+        key = f"deeptalk:report:{self.user.id}:{time_period}:{updated}:{version['count']}"
+        
+        report = await django_cache.aget(key)
+        if report is None:
+            report = await self._abuild_report(time_period)
+            await django_cache.aset(key, report, REPORT_CACHE_TIMEOUT)
+        return report
+    
+    async def _abuild_report(self, time_period: str) -> Dict[str, Any]:
+        """Build the report's sections from one shared task queryset"""
         
         if time_period == 'week':
             start_date = timezone.now() - timedelta(days=7)
@@ -392,40 +543,49 @@ class ProductivityAnalytics:
         else:  # year
             start_date = timezone.now() - timedelta(days=365)
         
+        # One lazy queryset shared by every analyzer; they chain filters and aggregates
+        # onto it, and rows that do get loaded carry their category without a query each
         tasks = Task.objects.filter(
             user=self.user,
             created_at__gte=start_date,
             deleted_at__isnull=True
-        )
+        ).select_related('category').only(*self.REPORT_TASK_FIELDS)
         
-        report = {
-            'overview': self._generate_overview_stats(tasks),
+        # The sections still written against the sync ORM run through sync_to_async.
+        # Every ORM call, async ones included, goes through the same thread-sensitive
+        # executor, so the sections' queries still run one after another
+        sections = {
+            'overview': sync_to_async(self._generate_overview_stats)(tasks),
             'productivity_trends': self._analyze_productivity_trends(tasks),
-            'time_management': self._analyze_time_management(tasks),
-            'goal_progress': self._analyze_goal_progress(tasks),
+            'time_management': sync_to_async(self._analyze_time_management)(tasks),
+            'goal_progress': sync_to_async(self._analyze_goal_progress)(tasks),
             'recommendations': self._generate_personalized_recommendations(tasks),
-            'comparative_analysis': self._generate_comparative_analysis(tasks),
+            'comparative_analysis': sync_to_async(self._generate_comparative_analysis)(tasks),
             'prediction': self._predict_future_performance(tasks)
         }
+        results = await asyncio.gather(*sections.values())
         
-        return report
+        return dict(zip(sections, results))
     
-    def _analyze_productivity_trends(self, tasks) -> Dict:
+    async def _analyze_productivity_trends(self, tasks) -> Dict:
         """Analyze productivity trends over time"""
         
-        # Daily completion rates
-        daily_completion = {}
-        for task in tasks.filter(status='completed'):
-            if task.completed_at:
-                date_key = task.completed_at.date().isoformat()
-                daily_completion[date_key] = daily_completion.get(date_key, 0) + 1
+        completed = tasks.filter(status='completed', completed_at__isnull=False)
+        
+        # Daily completion rates, counted per day by the database
+        daily_completion = {
+            row['day'].isoformat(): row['count']
+            async for row in completed.annotate(day=TruncDate('completed_at'))
+                                .values('day').annotate(count=Count('id')).order_by('day')
+        }
         
         # Peak productivity hours
-        hourly_completion = {}
-        for task in tasks.filter(status='completed'):
-            if task.completed_at:
-                hour = task.completed_at.hour
-                hourly_completion[hour] = hourly_completion.get(hour, 0) + 1
+        hourly_completion = {
+            hour: count
+            async for hour, count in completed.annotate(hour=ExtractHour('completed_at'))
+                                              .values('hour').annotate(count=Count('id')).order_by('hour')
+                                              .values_list('hour', 'count')
+        }
         
         peak_hour = max(hourly_completion.items(), key=lambda x: x[1])[0] if hourly_completion else 9
         
@@ -436,59 +596,81 @@ class ProductivityAnalytics:
             'consistency_score': self._calculate_consistency_score(daily_completion)
         }
     
-    def _generate_personalized_recommendations(self, tasks) -> List[str]:
+    def _calculate_consistency_score(self, daily_completion: Dict[str, int]) -> float:
+        """1 minus the coefficient of variation of the daily completion counts, clamped to [0, 1].
+        
+        One pass over the counts; they are ints, so the sums stay exact.
+        """
+        n = total = total_sq = 0
+        for count in daily_completion.values():
+            n += 1
+            total += count
+            total_sq += count * count
+        if n < 2 or not total:
+            return 0.0
+        
+        variance = (n * total_sq - total * total) / (n * n)
+        coefficient_of_variation = math.sqrt(variance) * n / total
+        return round(max(0.0, 1.0 - coefficient_of_variation), 2)
+    
+    async def _generate_personalized_recommendations(self, tasks) -> List[str]:
         """Generate AI-powered personalized recommendations"""
         
         recommendations = []
         
         # Analyze completion patterns
-        completion_rate = tasks.filter(status='completed').count() / tasks.count() if tasks.count() > 0 else 0
+        counts = await tasks.aaggregate(total=Count('id'), completed=Count('id', filter=Q(status='completed')))
+        completion_rate = counts['completed'] / counts['total'] if counts['total'] > 0 else 0
         
         if completion_rate < 0.6:
             recommendations.append("Consider breaking large tasks into smaller, manageable chunks")
             recommendations.append("Set more realistic deadlines to improve completion rates")
         
         # Analyze overdue patterns
-        overdue_count = tasks.filter(
+        overdue_count = await tasks.filter(
             deadline__lt=timezone.now(),
             status='pending'
-        ).count()
+        ).acount()
         
         if overdue_count > 3:
             recommendations.append("Schedule regular review sessions to stay on top of deadlines")
             recommendations.append("Consider using the smart scheduling feature for better time management")
         
-        # Category analysis
-        category_performance = {}
-        for task in tasks:
-            if task.category:
-                cat_name = task.category.name
-                if cat_name not in category_performance:
-                    category_performance[cat_name] = {'total': 0, 'completed': 0}
-                category_performance[cat_name]['total'] += 1
-                if task.status == 'completed':
-                    category_performance[cat_name]['completed'] += 1
+        # Category analysis: per-category totals grouped in the database
+        category_performance = (
+            tasks.filter(category__isnull=False)
+                 .values('category__name')
+                 .annotate(total=Count('id'), completed=Count('id', filter=Q(status='completed')))
+                 .order_by('category__name')
+        )
         
         # Find underperforming categories
-        for category, stats in category_performance.items():
+        async for stats in category_performance:
             completion_rate = stats['completed'] / stats['total'] if stats['total'] > 0 else 0
             if completion_rate < 0.5 and stats['total'] >= 3:
-                recommendations.append(f"Focus on improving {category} task completion - consider different approaches")
+                recommendations.append(f"Focus on improving {stats['category__name']} task completion - consider different approaches")
         
         return recommendations
     
-    def _predict_future_performance(self, tasks) -> Dict:
+    async def _predict_future_performance(self, tasks) -> Dict:
         """Predict future performance based on historical data"""
         
         # Simple trend analysis (in production, you'd use ML models)
-        recent_tasks = tasks.filter(created_at__gte=timezone.now() - timedelta(days=14))
-        older_tasks = tasks.filter(
-            created_at__gte=timezone.now() - timedelta(days=28),
-            created_at__lt=timezone.now() - timedelta(days=14)
+        now = timezone.now()
+        recent = Q(created_at__gte=now - timedelta(days=14))
+        older = Q(created_at__gte=now - timedelta(days=28), created_at__lt=now - timedelta(days=14))
+        done = Q(status='completed')
+        
+        # All four counts in one query
+        counts = await tasks.aaggregate(
+            recent=Count('id', filter=recent),
+            recent_completed=Count('id', filter=recent & done),
+            older=Count('id', filter=older),
+            older_completed=Count('id', filter=older & done),
         )
         
-        recent_completion_rate = recent_tasks.filter(status='completed').count() / recent_tasks.count() if recent_tasks.count() > 0 else 0
-        older_completion_rate = older_tasks.filter(status='completed').count() / older_tasks.count() if older_tasks.count() > 0 else 0
+        recent_completion_rate = counts['recent_completed'] / counts['recent'] if counts['recent'] > 0 else 0
+        older_completion_rate = counts['older_completed'] / counts['older'] if counts['older'] > 0 else 0
         
         trend = "improving" if recent_completion_rate > older_completion_rate else "declining" if recent_completion_rate < older_completion_rate else "stable"
         
@@ -15,17 +15,32 @@ from task_manager.models import (
 # ===================================
 
 class DeepTalkUserSerializer(serializers.ModelSerializer):
-    email = serializers.EmailField(source='user.email', read_only=True)
-    first_name = serializers.CharField(source='user.first_name', read_only=True)
-    last_name = serializers.CharField(source='user.last_name', read_only=True)
-    username = serializers.CharField(source='user.username', read_only=True)
+    # Auth user fields, copied straight from instance.user in to_representation
+    USER_FIELDS = ('email', 'username', 'first_name', 'last_name')
     
     class Meta:
         model = DeepTalkUser
         fields = [
-            'id', 'email', 'username', 'first_name', 'last_name',
+            'id',
             'phone_number', 'timezone', 'avatar_url', 'date_of_birth',
             'occupation', 'is_active', 'is_verified', 'subscription_tier',
             'last_login_at', 'email_verified_at', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    @classmethod
+    def prepare_queryset(cls, queryset):
+        """Join the auth user and load only the serialized columns (one query for a list)"""
+        return queryset.select_related('user').only(
+            *cls.Meta.fields, *(f'user__{name}' for name in cls.USER_FIELDS)
+        )
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        user = instance.user
+        # Same key order as before: id, the user fields, then the profile fields
+        return {
+            'id': data.pop('id'),
+            **{name: getattr(user, name) for name in self.USER_FIELDS},
+            **data
+        }
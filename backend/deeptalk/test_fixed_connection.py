@@ -3,6 +3,21 @@
 import requests
 import json
 
+# One keep-alive session for every request the script makes
+session = requests.Session()
+
+# Runs without Django settings, so it keeps its own copy of the agent module's helper
+def extract_first_json(text):
+    """First complete JSON object in text, or None"""
+    decoder = json.JSONDecoder()
+    start = text.find('{')
+    while start != -1:
+        try:
+            return decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    return None
+
 def test_fixed_ollama():
     """Test Ollama with llama3.2:latest model"""
     
@@ -14,7 +29,7 @@ def test_fixed_ollama():
     try:
         # Test health
         print("1. Testing health endpoint...")
-        health_response = requests.get(f"{url}/api/tags", timeout=5)
+        health_response = session.get(f"{url}/api/tags", timeout=5)
         print(f"   Status: {health_response.status_code}")
         
         if health_response.status_code == 200:
@@ -23,7 +38,7 @@ def test_fixed_ollama():
             
             # Test generation with correct model
             print(f"2. Testing generation with {model}...")
-            gen_response = requests.post(
+            gen_response = session.post(
                 f"{url}/api/generate",
                 json={
                     "model": model,
@@ -45,10 +60,8 @@ def test_fixed_ollama():
                 
                 # Try to parse JSON from response
                 try:
-                    import re
-                    json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                    if json_match:
-                        task_data = json.loads(json_match.group())
+                    task_data = extract_first_json(response_text)
+                    if task_data is not None:
                         print(f"   ✅ Successfully parsed task data: {task_data}")
                     else:
                         print(f"   ⚠️  Response doesn't contain valid JSON")
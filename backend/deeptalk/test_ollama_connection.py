@@ -3,6 +3,9 @@
 import requests
 import json
 
+# One keep-alive session for every request the script makes
+session = requests.Session()
+
 def test_ollama_connection():
     """Test different ways to connect to Ollama"""
     
@@ -20,7 +23,7 @@ def test_ollama_connection():
         try:
             # Test /api/tags endpoint
             print("1. Testing /api/tags...")
-            response = requests.get(f"{url}/api/tags", timeout=5)
+            response = session.get(f"{url}/api/tags", timeout=5)
             print(f"   Status: {response.status_code}")
             
             if response.status_code == 200:
@@ -31,7 +34,7 @@ def test_ollama_connection():
                 
                 # Test generation
                 print("2. Testing generation...")
-                gen_response = requests.post(
+                gen_response = session.post(
                     f"{url}/api/generate",
                     json={
                         "model": "llama3.1",
@@ -66,7 +69,7 @@ def pull_model_if_needed(url, model_name="llama3.1"):
     """Pull the model if it's not available"""
     try:
         print(f"\n=== Checking if {model_name} is available ===")
-        response = requests.get(f"{url}/api/tags", timeout=5)
+        response = session.get(f"{url}/api/tags", timeout=5)
         
         if response.status_code == 200:
             models = response.json().get("models", [])
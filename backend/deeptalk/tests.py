@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+
+from .scheduling_engine import AdvancedNLPProcessor
+
+
+class QueryComplexityTests(SimpleTestCase):
+    """AdvancedNLPProcessor._analyze_query_complexity routing"""
+
+    def setUp(self):
+        # The Ollama agent is only used once a handler calls the LLM
+        self.processor = AdvancedNLPProcessor(ollama_agent=None)
+
+    def assertComplexity(self, user_input, expected):
+        self.assertEqual(self.processor._analyze_query_complexity(user_input), expected)
+
+    def test_single_task_requests_are_simple(self):
+        self.assertComplexity("Schedule dentist next Tuesday at 3pm", 'simple')
+        self.assertComplexity("Go to the gym every morning", 'simple')
+        self.assertComplexity("Block all day Friday", 'simple')
+
+    def test_multi_step(self):
+        self.assertComplexity("Schedule gym and then dinner", 'multi_step')
+
+    def test_conditional(self):
+        self.assertComplexity("Move my run to Sunday if it rains", 'conditional')
+
+    def test_bulk_operation(self):
+        self.assertComplexity("Delete all completed tasks", 'bulk_operation')
+        self.assertComplexity("Move all meetings to Monday", 'bulk_operation')
@@ -14,6 +14,7 @@ from django.conf import settings
 
 # Import only what we need for AI functionality
 from .utils import get_deeptalk_user_from_request
+from ._ollama_client import OLLAMA_SESSION
 
 # Import task manager models with error handling
 try:
@@ -214,7 +215,7 @@ def get_available_ollama_model():
         if not hasattr(settings, 'OLLAMA_BASE_URL'):
             return None
             
-        response = requests.get(f"{settings.OLLAMA_BASE_URL}/api/tags", timeout=5)
+        response = OLLAMA_SESSION.get(f"{settings.OLLAMA_BASE_URL}/api/tags", timeout=5)
         if response.status_code == 200:
             models_data = response.json()
             available_models = [m.get('name') for m in models_data.get('models', [])]
@@ -305,7 +306,7 @@ If no actionable tasks found, return empty tasks array but still provide a helpf
         
         logger.debug(f"Calling Ollama at {ollama_url} with model {model_to_use}")
         
-        response = requests.post(ollama_url, json=payload, timeout=30)
+        response = OLLAMA_SESSION.post(ollama_url, json=payload, timeout=30)
         logger.debug(f"Ollama response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -377,7 +378,7 @@ def check_ollama_health():
             }
         
         health_url = f"{settings.OLLAMA_BASE_URL}/api/tags"
-        response = requests.get(health_url, timeout=5)
+        response = OLLAMA_SESSION.get(health_url, timeout=5)
         
         if response.status_code == 200:
             models = response.json().get('models', [])
@@ -441,7 +442,7 @@ def check_ollama_health():
             }
         
         health_url = f"{settings.OLLAMA_BASE_URL}/api/tags"
-        response = requests.get(health_url, timeout=5)
+        response = OLLAMA_SESSION.get(health_url, timeout=5)
         
         if response.status_code == 200:
             models = response.json().get('models', [])
@@ -41,6 +41,14 @@ class TaskCategory(models.Model):
     class Meta:
         db_table = 'task_categories'
         app_label = 'task_manager'
+        constraints = [
+            # System categories are shared, so their names must be unique
+            models.UniqueConstraint(
+                fields=['name'],
+                condition=models.Q(is_system_category=True),
+                name='uniq_system_category_name'
+            ),
+        ]
         
     def __str__(self):
         user_email = self.user.user.email if hasattr(self.user, 'user') else str(self.user) if self.user else 'System'